@@ -1,13 +1,23 @@
-from seleniumwire import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import pandas as pd
+try:
+    from seleniumwire import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+except ImportError:  # only the browser paths need it; --direct and scraper_check.py run without
+    webdriver = None
 import time
 import json
-import gzip
-import io
+import os
+import argparse
+import queue
+import re
+import asyncio
+from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from wowah.parsing import decode_monthly_response
+from wowah.store import DEFAULT_REALM, DEFAULT_REGION, STORE_PATH, RealmStore, parse_market
 
 # -----------------------------
 # 🔧 SETTINGS
@@ -25,21 +35,29 @@ item_urls = [
     "https://wowpricehub.com/eu/burning-legion/item/Orbinid-210804"
 ]
 
-all_data = []
+CHECKPOINT_PATH = "ah_scrape_checkpoint.json"
+MONTHLY_XHR_PATTERN = r"item.*monthly|monthly.*item"  # matches the "Monthly" chart XHR
+XHR_TIMEOUT = 15
+ENDPOINT_PATH = "ah_endpoint.json"  # learned monthly JSON endpoint template
+STALE_ENDPOINT_SHARE = 0.5  # more direct fetches failing than this means the template is relearned
+ITEM_URL_PATTERN = re.compile(r"/(?P<region>[^/]+)/(?P<realm>[^/]+)/item/(?P<slug>[^/?#]+)-(?P<item_id>\d+)/?$")
 
 # -----------------------------
-# 🚀 Scraper loop
+# 🌐 Fetch one item
 # -----------------------------
-for url in item_urls:
-    print(f"\n🔍 Processing: {url}")
-    try:
-        # Start a new browser session for every item
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        driver = webdriver.Chrome(options=options)
+def new_driver():
+    if webdriver is None:
+        raise ImportError("The browser paths need selenium-wire (pip install selenium-wire)")
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    return webdriver.Chrome(options=options)
 
+def scrape_item(url):
+    # Start a new browser session for every item
+    driver = new_driver()
+    try:
         driver.get(url)
         wait = WebDriverWait(driver, 15)
 
@@ -60,42 +78,304 @@ for url in item_urls:
 
         if not target_request:
             print("❌ No data found for:", url)
-            driver.quit()
-            continue
+            return None
 
         print(f"📡 Intercepted request: {target_request.url}")
+        return decode_monthly_response(target_request.response.body)
+    finally:
+        driver.quit()  # ✅ Fully kill browser for next item
 
-        # Decompress response
-        compressed = io.BytesIO(target_request.response.body)
-        with gzip.GzipFile(fileobj=compressed) as f:
-            raw_data = f.read().decode('utf-8')
+# -----------------------------
+# 🏊 Browser pool
+# -----------------------------
+def intercept_monthly(driver, url):
+    # Drop whatever was captured for the previous item on this driver
+    del driver.requests
+    driver.get(url)
+    wait = WebDriverWait(driver, XHR_TIMEOUT)
 
-        json_data = json.loads(raw_data)
+    # Click the "Monthly" button as soon as it exists (JS click, so no scroll pause needed)
+    monthly_button = wait.until(EC.presence_of_element_located((By.XPATH, '//button[text()="Monthly"]')))
+    driver.execute_script("arguments[0].click();", monthly_button)
 
-        # Parse item name and auction data
-        item_name = json_data["item"]["itemName"]
-        df = pd.DataFrame(json_data["auctions"])
-        df["timestamp"] = pd.to_datetime(df["dateTime"])
-        df.rename(columns={"price": "market_value", "minBuyout": "min_buyout"}, inplace=True)
-        df.drop(columns=["dateTime"], inplace=True)
-        df["item_name"] = item_name
+    # Wait on the monthly XHR itself instead of a fixed sleep
+    request = driver.wait_for_request(MONTHLY_XHR_PATTERN, timeout=XHR_TIMEOUT)
+    wait.until(lambda _: request.response is not None)
+    print(f"📡 Intercepted request: {request.url}")
+    return request
 
-        all_data.append(df)
-        print(f"✅ {item_name} scraped with {len(df)} entries.")
+def fetch_with_driver(driver, url):
+    return decode_monthly_response(intercept_monthly(driver, url).response.body)
 
-        driver.quit()  # ✅ Fully kill browser for next item
+class BrowserPool:
+    # driver_factory / fetch default to real Chrome; scraper_check.py swaps in a fake driver
+    def __init__(self, size, driver_factory=None, fetch=None):
+        self._new_driver = driver_factory or new_driver
+        self._fetch = fetch or fetch_with_driver
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(self._new_driver())
+
+    def fetch(self, url):
+        driver = self._idle.get()
+        try:
+            return self._fetch(driver, url)
+        except Exception:
+            # A failed page can leave the browser in a bad state; swap in a fresh one
+            driver.quit()
+            driver = self._new_driver()
+            raise
+        finally:
+            self._idle.put(driver)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get().quit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# -----------------------------
+# ⚡ Direct JSON fetch (no browser)
+# -----------------------------
+def item_url_parts(url):
+    match = ITEM_URL_PATTERN.search(url)
+    if not match:
+        raise ValueError(f"Not an item page URL: {url}")
+    return match.groupdict()
+
+def learn_endpoint_template(page_url, xhr_url):
+    # Turn one intercepted XHR URL into a template by swapping the page's own
+    # path tokens (item id, name slug, realm, region) for placeholders.
+    template = xhr_url
+    parts = item_url_parts(page_url)
+    for key in ("item_id", "slug", "realm", "region"):
+        for token in {parts[key], unquote(parts[key])}:
+            template = re.sub(rf"(?<=[/=]){re.escape(token)}(?=[/?&.]|$)", f"{{{key}}}", template)
+    if "{item_id}" not in template and "{slug}" not in template:
+        raise ValueError(f"Could not find the item in the intercepted URL: {xhr_url}")
+    return template
+
+def url_market(url):
+    # (region, realm) of an item page; URLs outside that layout go to the default market
+    match = ITEM_URL_PATTERN.search(url)
+    if not match:
+        return DEFAULT_REGION, DEFAULT_REALM
+    return unquote(match["region"]).lower(), unquote(match["realm"]).lower()
+
+def realm_url(url, region, realm):
+    # The same item page on another realm
+    match = ITEM_URL_PATTERN.search(url)
+    if not match:
+        raise ValueError(f"Not an item page URL: {url}")
+    return url[:match.start("region")] + f"{region}/{realm}" + url[match.end("realm"):]
+
+def endpoint_for(template, page_url):
+    return template.format(**item_url_parts(page_url))
+
+def load_endpoint_template(path=ENDPOINT_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["template"]
+
+def save_endpoint_template(template, path=ENDPOINT_PATH):
+    with open(path, "w") as f:
+        json.dump({"template": template}, f, indent=2)
+
+def forget_endpoint_template(path=ENDPOINT_PATH):
+    if os.path.exists(path):
+        os.remove(path)
 
-    except Exception as e:
-        print(f"⚠️ Error scraping {url}:", e)
+def endpoint_is_stale(failures, attempts):
+    # A moved endpoint fails every item; a few flaky items do not justify a relearn
+    return failures > 0 and failures > STALE_ENDPOINT_SHARE * attempts
+
+def learn_endpoint(url):
+    # One browser visit: learn the endpoint and keep that item's data
+    driver = new_driver()
+    try:
+        request = intercept_monthly(driver, url)
+        return learn_endpoint_template(url, request.url), decode_monthly_response(request.response.body)
+    finally:
         driver.quit()
 
+async def fetch_json_items(urls, template, concurrency=8):
+    import aiohttp  # only needed for --direct
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)  # keep-alive connections are reused across items
+    timeout = aiohttp.ClientTimeout(total=XHR_TIMEOUT)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async def fetch_one(url):
+            async with semaphore:
+                try:
+                    headers = {"Accept-Encoding": "gzip", "Referer": url}
+                    async with session.get(endpoint_for(template, url), headers=headers) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+                    return url, decode_monthly_response(body), None
+                except Exception as e:
+                    return url, None, e
+
+        return await asyncio.gather(*(fetch_one(url) for url in urls))
+
+# -----------------------------
+# 💾 Incremental merge + checkpoint
+# -----------------------------
+def new_rows_only(store, df):
+    # Keep only rows past the item's high-water mark in its realm, deduplicated on (item_name, timestamp)
+    df = df.drop_duplicates(subset=["item_name", "timestamp"], keep="last")
+    if not len(df):
+        return df
+    hwm = store.high_water_mark(df["item_name"].iloc[0], df["region"].iloc[0], df["realm"].iloc[0])
+    if hwm is None:
+        return df
+    return df[df["timestamp"] > hwm]
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(json.load(f)["done"])
+
+def save_checkpoint(done, path=CHECKPOINT_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"done": sorted(done)}, f, indent=2)
+    os.replace(tmp_path, path)
+
+def load_item_urls(path=None, realms=None):
+    # realms: optional list of "region/realm"; every item URL is expanded to each of them
+    if path is None:
+        urls = item_urls
+    else:
+        with open(path) as f:
+            urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not realms:
+        return urls
+    markets = [parse_market(realm) for realm in realms]
+    return list(dict.fromkeys(realm_url(url, region, realm) for url in urls for region, realm in markets))
+
 # -----------------------------
-# 💾 Save aggregated data
+# 🚀 Scraper loop
 # -----------------------------
-if all_data:
-    combined_df = pd.concat(all_data, ignore_index=True)
-    combined_df.to_csv("aggregated_wow_ah_monthly.csv", index=False)
-    print("\n✅ Saved aggregated data to 'aggregated_wow_ah_monthly.csv'")
-    print(combined_df.head())
-else:
-    print("\n❌ No data collected.")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape monthly AH price history into the price store.")
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--items-file", help="file with one item URL per line (default: item_urls)")
+    parser.add_argument("--realms", nargs="+", metavar="REGION/REALM",
+                        help="scrape every item on each of these realms (e.g. eu/burning-legion us/area-52)")
+    parser.add_argument("--full", action="store_true", help="merge every fetched row, not only rows past the high-water mark")
+    parser.add_argument("--resume", action="store_true", help=f"skip items already finished in the run recorded in {CHECKPOINT_PATH}")
+    parser.add_argument("--pool", type=int, default=0, help="fetch concurrently with a pool of N reused browsers")
+    parser.add_argument("--direct", action="store_true", help="request the monthly JSON directly; browsers are only a fallback")
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel requests in --direct mode")
+    parser.add_argument("--endpoint-template", help=f"monthly JSON URL template (default: learned once, cached in {ENDPOINT_PATH})")
+    args = parser.parse_args(argv)
+
+    store = RealmStore(args.store)
+    done = load_checkpoint() if args.resume else set()
+    total_added = 0
+    failed = []
+
+    pending = []
+    for url in load_item_urls(args.items_file, args.realms):
+        if url in done:
+            print(f"\n⏭️ Already scraped in this run: {url}")
+        else:
+            pending.append(url)
+
+    # Store writes and checkpoints stay on this thread; only fetching is concurrent
+    def handle(url, fetch):
+        nonlocal total_added
+        print(f"\n🔍 Processing: {url}")
+        try:
+            df = fetch()
+        except Exception as e:
+            print(f"⚠️ Error scraping {url}:", e)
+            failed.append(url)
+            return
+        if df is None:
+            failed.append(url)
+            return
+
+        # Realm and region are part of every row, so each realm is stored as its own market
+        region, realm = url_market(url)
+        df["region"], df["realm"] = region, realm
+        fresh = df if args.full else new_rows_only(store, df)
+        added = store.append(fresh) if len(fresh) else 0
+        total_added += added
+        print(f"✅ {df['item_name'].iloc[0]} ({region}/{realm}) scraped with {len(df)} entries, {added} new.")
+
+        # Checkpoint after each item so a crash only loses the item in flight
+        done.add(url)
+        save_checkpoint(done)
+
+    def learn(url):
+        # One browser visit learns the template and keeps that item's data; None on failure
+        try:
+            template, df = learn_endpoint(url)
+        except Exception as e:
+            print(f"⚠️ Could not learn the JSON endpoint from {url}:", e)
+            return None
+        save_endpoint_template(template)
+        print(f"🧭 Learned endpoint template: {template}")
+        handle(url, lambda: df)
+        return template
+
+    if args.direct and pending:
+        template = args.endpoint_template or load_endpoint_template()
+        if template is None:
+            template = learn(pending[0])
+            if template is not None:
+                pending.pop(0)
+
+        if template is not None:
+            results = asyncio.run(fetch_json_items(pending, template, args.concurrency))
+            failures = [url for url, _, error in results if error is not None]
+            if endpoint_is_stale(len(failures), len(results)):
+                print(f"\n🧭 {len(failures)} of {len(results)} direct fetches failed; the endpoint template looks stale.")
+                if args.endpoint_template:
+                    print("⚠️ Keeping the --endpoint-template given on the command line; check it against the site.")
+                else:
+                    # Drop it, so a failed relearn still leaves the next run to learn from scratch
+                    forget_endpoint_template()
+                    template = learn(failures[0])
+                    if template is not None:
+                        retried = asyncio.run(fetch_json_items(failures[1:], template, args.concurrency))
+                        results = [r for r in results if r[2] is None] + retried
+            pending = []
+            for url, df, error in results:
+                if error is None:
+                    handle(url, lambda: df)
+                else:
+                    # Fall back to the browser path for anything the direct fetch missed
+                    print(f"↩️ Direct fetch failed for {url} ({error}); falling back to the browser.")
+                    pending.append(url)
+
+    if args.pool > 0:
+        with BrowserPool(args.pool) as pool, ThreadPoolExecutor(max_workers=args.pool) as executor:
+            futures = {executor.submit(pool.fetch, url): url for url in pending}
+            for future in as_completed(futures):
+                handle(futures[future], future.result)
+    else:
+        for url in pending:
+            handle(url, lambda: scrape_item(url))
+
+    # Keep the checkpoint while anything failed, so --resume retries just those items
+    if failed:
+        print(f"\n⚠️ {len(failed)} item(s) failed; rerun with --resume to retry them.")
+    elif os.path.exists(CHECKPOINT_PATH):
+        os.remove(CHECKPOINT_PATH)
+    if total_added:
+        print(f"\n✅ Appended {total_added} new rows to the price store '{args.store}'")
+    else:
+        print("\n❌ No new data collected.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from wowah.store import AHPriceStore, RealmStore, load_market_data, main
+
+if __name__ == "__main__":
+    main()
@@ -1,64 +1,93 @@
-import time
+import os
+import hashlib
+import argparse
+import queue
+import threading
+import urllib.request
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from selenium.common.exceptions import TimeoutException
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime
 
 # ---------------------------
-# DATE NORMALIZATION UTILITY
+# SETTINGS
 # ---------------------------
-def normalize_date(date_str):
-    now = datetime.now()
-    try:
-        date_str = date_str.lower().replace("posted", "").strip()
-
-        if "min ago" in date_str or "hr" in date_str or "day" in date_str:
-            time_ago = date_str.replace("ago", "").strip()
-            tokens = time_ago.split()
-            delta = {}
-            i = 0
-            while i < len(tokens):
-                if tokens[i] in ["hr", "hrs", "hour", "hours"]:
-                    delta["hours"] = int(tokens[i - 1])
-                elif tokens[i] in ["min", "mins", "minute", "minutes"]:
-                    delta["minutes"] = int(tokens[i - 1])
-                elif tokens[i] in ["day", "days"]:
-                    delta["days"] = int(tokens[i - 1])
-                i += 1
-            offset = pd.Timedelta(**delta)
-            return (now - offset).strftime("%Y-%m-%d")
-        else:
-            dt = pd.to_datetime(date_str, errors='coerce')
-            if pd.isna(dt):
-                return None
-            return dt.strftime("%Y-%m-%d")
-    except Exception:
-        return None
+OUTPUT_PATH = "wowhead_articles_with_dates.xlsx"
+CACHE_DIR = "wowhead_cache"  # raw article HTML, one file per URL
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+# lxml is several times faster than html.parser; fall back if it is not installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Only build the article body, not the whole page tree. Match the class token,
+# like find(class_=...), so <div class="news-post-content extra"> still counts
+ARTICLE_CLASS = "news-post-content"
+ARTICLE_STRAINER = SoupStrainer("div", class_=lambda c: c is not None and ARTICLE_CLASS in c.split())
 
 # ---------------------------
 # SETUP SELENIUM
 # ---------------------------
-options = Options()
-options.add_argument("--headless=new")
-service = Service()
-driver = webdriver.Chrome(service=service, options=options)
+def new_driver():
+    options = Options()
+    options.add_argument("--headless=new")
+    service = Service()
+    return webdriver.Chrome(service=service, options=options)
+
+# Browsers for articles the plain HTTP fetch cannot read. Started on first use,
+# so runs where urllib works never launch one; at most `size` pages load at once
+class DriverPool:
+    def __init__(self, size):
+        self._idle = queue.Queue()
+        self._slots = threading.Semaphore(size)
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def driver(self):
+        with self._slots:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                driver = new_driver()
+                with self._lock:
+                    self._drivers.append(driver)
+            try:
+                yield driver
+            finally:
+                self._idle.put(driver)
+
+    def close(self):
+        for driver in self._drivers:
+            driver.quit()
 
 # ---------------------------
 # GET LINKS + DATES
 # ---------------------------
 
-def get_article_links_from_page(page_num):
+def get_article_links_from_page(driver, page_num):
     url = f"https://www.wowhead.com/news?page={page_num}"
     print(f"🔄 Scraping page {page_num}: {url}")
     driver.get(url)
-    time.sleep(3)
+    try:
+        WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.CLASS_NAME, "news-card-simple"))
+        )
+    except TimeoutException:
+        pass
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = BeautifulSoup(driver.page_source, HTML_PARSER)
     anchors = soup.find_all("a", class_="news-card-simple-thumbnail")
 
     links = []
@@ -87,43 +116,129 @@ def get_article_links_from_page(page_num):
         print("⚠️ No news cards found on page", page_num)
     return links
 
+# ---------------------------
+# HTML CACHE
+# ---------------------------
+def cache_path(url, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".html")
+
+def fetch_html(url, cache_dir=CACHE_DIR):
+    path = cache_path(url, cache_dir)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        html = response.read().decode("utf-8", errors="replace")
+
+    write_cache(path, html)
+    return html
+
+def write_cache(path, html):
+    # Write to a temp file and swap it in, so an interrupted run never leaves a truncated entry
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(html)
+    os.replace(tmp_path, path)
+
 # ---------------------------
 # SCRAPE CONTENT
 # ---------------------------
-def extract_article_text(article_url):
+def parse_article_text(html):
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=ARTICLE_STRAINER)
+    content_div = soup.find("div", class_=ARTICLE_CLASS)
+    return content_div.get_text(separator="\n").strip() if content_div else ""
+
+def extract_article_text(article_url, cache_dir=CACHE_DIR, drivers=None):
     print(f"📰 Extracting: {article_url}")
-    driver.get(article_url)
     try:
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "news-post-content"))
-        )
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        content_div = soup.find("div", class_="news-post-content")
-        return content_div.get_text(separator="\n").strip()
-    except:
-        print(f"❌ Failed to extract: {article_url}")
-        return ""
+        content = parse_article_text(fetch_html(article_url, cache_dir))
+        if content or drivers is None:
+            return content
+    except Exception as e:
+        if drivers is None:
+            print(f"❌ Failed to extract: {article_url} ({e})")
+            return ""
+
+    # Fall back to a pooled browser when the plain HTTP page has no article body
+    with drivers.driver() as driver:
+        driver.get(article_url)
+        try:
+            WebDriverWait(driver, 15).until(
+                EC.presence_of_element_located((By.CLASS_NAME, ARTICLE_CLASS))
+            )
+            html = driver.page_source
+        except Exception:
+            print(f"❌ Failed to extract: {article_url}")
+            return ""
+
+    write_cache(cache_path(article_url, cache_dir), html)
+    content = parse_article_text(html)
+    if not content:
+        print(f"⚠️ No article body found: {article_url}")
+    return content
 
 # ---------------------------
 # MAIN LOGIC
 # ---------------------------
-all_articles = []
-for page in range(1, 10):  # Adjust range as needed
-    articles = get_article_links_from_page(page)
-    for article in articles:
-        content = extract_article_text(article["url"])
-        if content:
-            all_articles.append({
-                "url": article["url"],
-                "date": article["normalized_date"],
-                "content": content
-            })
+def load_existing_articles(path=OUTPUT_PATH):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=["url", "date", "content"])
+    return pd.read_excel(path)
 
-# ---------------------------
-# SAVE OUTPUT
-# ---------------------------
-df = pd.DataFrame(all_articles)
-df.to_excel("wowhead_articles_with_dates.xlsx", index=False)
-print(f"\n✅ Saved {len(df)} articles to wowhead_articles_with_dates.xlsx")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape WoWHead news articles.")
+    parser.add_argument("--pages", type=int, default=9, help="listing pages to scan")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent article fetches")
+    parser.add_argument("--browsers", type=int, default=2, help="browsers for articles plain HTTP cannot read")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--all-pages", action="store_true", help="keep scanning after a page with no new articles")
+    args = parser.parse_args(argv)
+
+    existing = load_existing_articles(args.output)
+    known = set(existing["url"])
+
+    driver = new_driver()  # listing pages only; article fallbacks use the pool
+    drivers = DriverPool(args.browsers)
+    all_articles = []
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = {}
+            # Listing stage feeds the article pool page by page
+            for page in range(1, args.pages + 1):
+                articles = get_article_links_from_page(driver, page)
+                new_articles = [a for a in articles if a["url"] not in known]
+                for article in new_articles:
+                    known.add(article["url"])
+                    future = pool.submit(extract_article_text, article["url"], args.cache_dir, drivers)
+                    futures[future] = article
+                # Listings are newest first, so a page with nothing new means we are caught up
+                if articles and not new_articles and not args.all_pages:
+                    print(f"⏹️ No new articles on page {page}, stopping.")
+                    break
+
+            for future in as_completed(futures):
+                article = futures[future]
+                content = future.result()
+                if content:
+                    all_articles.append({
+                        "url": article["url"],
+                        "date": article["normalized_date"],
+                        "content": content
+                    })
+    finally:
+        driver.quit()
+        drivers.close()
+
+    # ---------------------------
+    # SAVE OUTPUT
+    # ---------------------------
+    df = pd.concat([existing, pd.DataFrame(all_articles)], ignore_index=True)
+    df.to_excel(args.output, index=False)
+    print(f"\n✅ Saved {len(all_articles)} new articles ({len(df)} total) to {args.output}")
 
-driver.quit()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from wowah import InsightfulTrader, VanillaTrader, prepare_market_data
+from wowah import simulator_v2
+from wowah.parsing import decode_monthly_response, normalize_date
+from wowah.synthetic import article_dates, monthly_payloads, synthetic_impacts, synthetic_market
+
+# === Parameters ===
+SIZES = ["10x720", "50x2160"]  # items x hourly snapshots
+REPEAT = 3
+ARTICLES = 5000
+OUTPUT_DIR = "benchmarks"
+
+
+# === Benchmarks ===
+# Each entry builds its inputs (untimed) and returns (callable to time, units processed).
+# Inputs are rebuilt for every repeat, since the traders are stateful.
+def bench_prepare_data(ctx):
+    bot = VanillaTrader(ctx["data"])
+    return bot.prepare_data, len(ctx["data"])
+
+
+def bench_vanilla(engine):
+    def bench(ctx):
+        bot = VanillaTrader(ctx["prepared"], engine=engine, prepared=True)
+        return bot.simulate, len(ctx["prepared"])
+    return bench
+
+
+def bench_insightful(ctx):
+    bot = InsightfulTrader(ctx["prepared"], ctx["impacts"], prepared=True)
+    return bot.simulate, len(ctx["prepared"])
+
+
+def bench_v2_signals(ctx):
+    train, test = ctx["v2_split"]
+    return lambda: simulator_v2.generate_signals(train, test), len(test)
+
+
+def bench_v2_simulate(ctx):
+    test = ctx["v2_split"][1]
+    signals = ctx["v2_signals"]
+    return lambda: simulator_v2.simulate(signals, test), len(signals)
+
+
+def bench_decode(ctx):
+    bodies = ctx["payloads"]
+    return lambda: [decode_monthly_response(body) for body in bodies], len(ctx["data"])
+
+
+def bench_normalize_date(ctx):
+    dates = ctx["dates"]
+    return lambda: [normalize_date(d) for d in dates], len(dates)
+
+
+BENCHMARKS = {
+    "prepare_data": bench_prepare_data,
+    "vanilla_simulate_loop": bench_vanilla("loop"),
+    "vanilla_simulate_numpy": bench_vanilla("numpy"),
+    "insightful_simulate": bench_insightful,
+    "v2_generate_signals": bench_v2_signals,
+    "v2_simulate": bench_v2_simulate,
+    "ah_decode_monthly": bench_decode,
+    "wowhead_normalize_date": bench_normalize_date,
+}
+
+
+# === Runner ===
+def parse_size(size):
+    items, snapshots = size.lower().split("x")
+    return int(items), int(snapshots)
+
+
+def build_context(n_items, n_snapshots, seed, articles):
+    # Shared inputs for one dataset size, built once
+    data = synthetic_market(n_items, n_snapshots, seed)
+    prepared = prepare_market_data(data)
+    v2_split = simulator_v2.split_half(data)
+    return {
+        "data": data,
+        "prepared": prepared,
+        "impacts": synthetic_impacts(data["item_name"].unique(), seed),
+        "v2_split": v2_split,
+        "v2_signals": simulator_v2.generate_signals(*v2_split),
+        "payloads": monthly_payloads(data),
+        "dates": article_dates(articles, seed),
+    }
+
+
+def time_benchmark(bench, ctx, repeat):
+    times = []
+    for _ in range(repeat):
+        run, units = bench(ctx)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    best = min(times)
+    return {
+        "units": units,
+        "min_s": best,
+        "median_s": statistics.median(times),
+        "runs_s": times,
+        "per_unit_us": 1e6 * best / units if units else None,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_suite(sizes, names, repeat=REPEAT, seed=0, articles=ARTICLES):
+    report = {"environment": environment(), "repeat": repeat, "seed": seed, "results": []}
+    for size in sizes:
+        n_items, n_snapshots = parse_size(size)
+        ctx = build_context(n_items, n_snapshots, seed, articles)
+        print(f"\n📦 {n_items} items x {n_snapshots} snapshots = {len(ctx['data']):,} rows")
+        timings = {}
+        for name in names:
+            timings[name] = result = time_benchmark(BENCHMARKS[name], ctx, repeat)
+            print(f"⏱️ {name:<24} {result['min_s']:9.4f}s  ({result['per_unit_us']:.2f} µs per unit, {result['units']:,} units)")
+        report["results"].append({
+            "items": n_items,
+            "snapshots": n_snapshots,
+            "rows": len(ctx["data"]),
+            "timings": timings,
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the simulators, feature prep and scraper parse stages on synthetic data.")
+    parser.add_argument("--sizes", nargs="+", default=SIZES, help="dataset sizes as ITEMSxSNAPSHOTS (default: %(default)s)")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--skip", nargs="+", choices=sorted(BENCHMARKS), default=[], help="leave these benchmarks out")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed runs per benchmark; min and median are reported")
+    parser.add_argument("--articles", type=int, default=ARTICLES, help="byline strings for the normalize_date benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help=f"JSON report path (default: {OUTPUT_DIR}/bench_<UTC time>.json)")
+    args = parser.parse_args(argv)
+
+    names = [name for name in (args.only or BENCHMARKS) if name not in args.skip]
+    report = run_suite(args.sizes, names, args.repeat, args.seed, args.articles)
+
+    output = args.output
+    if output is None:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        output = os.path.join(OUTPUT_DIR, f"bench_{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Benchmark report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from wowah import VanillaTrader, prepare_market_data
+from wowah.batched import BatchedTrader
+from wowah.streaming import StreamingTrader
+from wowah.store import load_market_data
+from wowah.synthetic import synthetic_market
+
+# === Parameters ===
+DATA_PATH = None  # ah_store/ if present, else aggregated_wow_ah_monthly.csv
+
+
+# === Datasets ===
+def with_missing_quantity(data, seed=0, small=0.3, missing=0.02):
+    # Float quantity column with gaps: small listings cap buys at a float
+    # quantity, and NaN rows must count as nothing listed in every engine
+    rng = np.random.default_rng(seed)
+    quantity = data["quantity"].to_numpy(dtype=float)
+    quantity = np.where(rng.random(len(data)) < small, rng.integers(0, 20, size=len(data)), quantity)
+    quantity[rng.random(len(data)) < missing] = np.nan
+    return data.assign(quantity=quantity)
+
+
+# === Parity + timing ===
+def run_engine(trader_cls, data, engine):
+    bot = trader_cls(data, engine=engine)
+    start = time.perf_counter()
+    bot.simulate()
+    return bot, time.perf_counter() - start
+
+
+def check_parity(trader_cls, data):
+    loop_bot, loop_time = run_engine(trader_cls, data, "loop")
+    numpy_bot, numpy_time = run_engine(trader_cls, data, "numpy")
+
+    pd.testing.assert_frame_equal(loop_bot.results(), numpy_bot.results())
+    assert loop_bot.gold == numpy_bot.gold, (loop_bot.gold, numpy_bot.gold)
+    for item, inv in loop_bot.inventory.items():
+        if inv["qty"] > 0:
+            assert numpy_bot.inventory[item] == inv, (item, inv, numpy_bot.inventory[item])
+
+    return {
+        "rows": len(data),
+        "trades": len(loop_bot.trade_log),
+        "final_gold": loop_bot.gold,
+        "loop_s": loop_time,
+        "numpy_s": numpy_time,
+        "speedup": loop_time / numpy_time if numpy_time else float("inf"),
+    }
+
+
+def check_batched_parity(data, configs):
+    # Every run of one BatchedTrader pass must end where its own trader ends
+    features = prepare_market_data(data)
+    start = time.perf_counter()
+    batched = BatchedTrader(features, configs)
+    batched.simulate()
+    batched_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for k, params in enumerate(batched.configs):
+        bot = VanillaTrader(features, engine="numpy", prepared=True, params=params)
+        bot.simulate()
+        assert bot.gold == batched.gold[k], (k, bot.gold, batched.gold[k])
+        assert len(bot.trade_log) == batched.trades[k], (k, len(bot.trade_log), batched.trades[k])
+        for j, item in enumerate(batched.items):
+            inv = bot.inventory.get(item, {"qty": 0, "avg_cost": 0})
+            assert inv["qty"] == batched.inv_qty[k, j], (k, item, inv, batched.inv_qty[k, j])
+            if inv["qty"] > 0:
+                assert inv["avg_cost"] == batched.inv_cost[k, j], (k, item, inv, batched.inv_cost[k, j])
+    single_time = time.perf_counter() - start
+
+    return {
+        "configs": len(configs),
+        "numpy_s": single_time,
+        "batched_s": batched_time,
+        "speedup": single_time / batched_time if batched_time else float("inf"),
+    }
+
+
+def check_streaming_parity(data, params=None):
+    # Replaying the history tick by tick must reproduce the batch backtest
+    batch_bot = VanillaTrader(data, engine="numpy", params=params)
+    start = time.perf_counter()
+    batch_bot.simulate()
+    batch_time = time.perf_counter() - start
+
+    stream_bot = StreamingTrader(data, params=params)
+    start = time.perf_counter()
+    stream_bot.simulate()
+    stream_time = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(batch_bot.results(), stream_bot.results())
+    assert batch_bot.gold == stream_bot.gold, (batch_bot.gold, stream_bot.gold)
+    return {
+        "trades": len(stream_bot.trade_log),
+        "batch_s": batch_time,
+        "streaming_s": stream_time,
+        "per_snapshot_ms": 1000 * stream_time / max(1, data["timestamp"].nunique()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the numpy engine against the row loop and time both.")
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--snapshots", type=int, default=24 * 90)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--real-data", action="store_true", help="also check against the scraped price data")
+    parser.add_argument("--batched", type=int, default=0, metavar="K",
+                        help="also check a BatchedTrader pass over K sampled configs")
+    parser.add_argument("--streaming", action="store_true", help="also check the streaming trader's replay")
+    args = parser.parse_args(argv)
+
+    synthetic = synthetic_market(args.items, args.snapshots, args.seed)
+    datasets = {"synthetic": synthetic, "synthetic, gaps in quantity": with_missing_quantity(synthetic, args.seed)}
+    if args.real_data:
+        datasets["real"] = load_market_data(DATA_PATH)
+
+    for label, data in datasets.items():
+        report = check_parity(VanillaTrader, data)
+        print(f"\n✅ {label}: identical trade log ({report['trades']} trades) and final gold {report['final_gold']:,.2f}")
+        print(f"⏱️ loop {report['loop_s']:.3f}s | numpy {report['numpy_s']:.3f}s | {report['speedup']:.1f}x over {report['rows']:,} rows")
+
+        if args.batched:
+            from wowah.sweep import DEFAULT_SPACE, latin_hypercube
+            space = {k: v for k, v in DEFAULT_SPACE.items() if k != "ma_window"}
+            report = check_batched_parity(data, latin_hypercube(space, args.batched, args.seed))
+            print(f"✅ {label}: batched pass matches {report['configs']} separate runs")
+            print(f"⏱️ numpy x{report['configs']} {report['numpy_s']:.3f}s | batched {report['batched_s']:.3f}s | {report['speedup']:.1f}x")
+
+        if args.streaming:
+            report = check_streaming_parity(data)
+            print(f"✅ {label}: streaming replay matches the batch backtest ({report['trades']} trades)")
+            print(f"⏱️ batch {report['batch_s']:.3f}s | streaming {report['streaming_s']:.3f}s | {report['per_snapshot_ms']:.3f} ms per snapshot")
+
+
+if __name__ == "__main__":
+    main()
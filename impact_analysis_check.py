@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from wowah import impact_analysis as ia
+
+# === Parameters ===
+ITEMS = ia.portfolio_items
+
+
+# === Fake LLM client ===
+# Answers like the chat completions API, deterministically from the prompt: the
+# article with URL .../n affects ITEMS[n % len(ITEMS)] with score n % 11 - 5, and
+# batched replies carry each article's ID. Counts calls, and the first `failures`
+# calls raise `error` instead; `tamper` rewrites a reply before it is sent.
+class RateLimitError(Exception):
+    def __init__(self):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = SimpleNamespace(headers={"retry-after": "0"})  # no real backoff sleep
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+class FakeClient:
+    def __init__(self, failures=0, error=RateLimitError, jitter=0.0, seed=0, tamper=None):
+        self.calls = 0
+        self.prompts = []
+        self.failures = failures
+        self.error = error
+        self.jitter = jitter  # random delay per call, so requests finish out of order
+        self.tamper = tamper
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages):
+        with self._lock:
+            self.calls += 1
+            self.prompts.append(messages[0]["content"])
+            fail = self.calls <= self.failures
+            delay = self._rng.uniform(0, self.jitter)
+        time.sleep(delay)
+        if fail:
+            raise self.error()
+        reply = self.answer(messages[0]["content"])
+        content = json.dumps(self.tamper(reply) if self.tamper else reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def answer(self, prompt):
+        batch = re.findall(r"^=== Article ID: (A\d+) ===\nArticle date: .*\nURL: https://example\.test/news/(\d+)$", prompt, re.M)
+        if batch:
+            return [{"article_id": article_id, **impact_for(int(n))} for article_id, n in batch]
+        return [impact_for(int(n)) for n in re.findall(r"^URL: https://example\.test/news/(\d+)$", prompt, re.M)]
+
+
+def impact_for(n):
+    return {"affected_item": ITEMS[n % len(ITEMS)], "interpretation": f"article {n}", "impact_score": n % 11 - 5}
+
+
+def synthetic_articles(n, seed=0, words=(20, 200)):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "content": [" ".join(f"word{rng.randrange(1000)}" for _ in range(rng.randint(*words))) for _ in range(n)],
+        "date": pd.date_range("2024-07-01", periods=n, freq="6h"),
+        "url": [f"https://example.test/news/{i}" for i in range(n)],
+    })
+
+
+def expected_rows(df):
+    rows = [{"date": d, "url": u, **impact_for(i)} for i, (d, u) in enumerate(zip(df["date"], df["url"]))]
+    return pd.DataFrame(rows, columns=["date", "url", "affected_item", "interpretation", "impact_score"])
+
+
+# === Checks ===
+def check_cache(df, workdir, workers):
+    # A second run over the same articles, even with a fresh connection, makes no calls
+    path = os.path.join(workdir, "cache.sqlite")
+    client = FakeClient()
+    cache = ia.ResponseCache(path)
+    first = ia.analyze_articles(client, df, cache=cache, max_workers=workers)
+    cache.close()
+    assert client.calls == len(df), client.calls
+
+    cache = ia.ResponseCache(path)
+    second = ia.analyze_articles(client, df, cache=cache, max_workers=workers)
+    assert client.calls == len(df), client.calls - len(df)
+    pd.testing.assert_frame_equal(first, second)
+
+    # A new article misses the cache and costs exactly one call
+    more = pd.concat([df, synthetic_articles(len(df) + 1).tail(1)], ignore_index=True)
+    ia.analyze_articles(client, more, cache=cache, max_workers=workers)
+    cache.close()
+    assert client.calls == len(df) + 1, client.calls
+
+
+def check_parallel_order(df, workers):
+    # Requests finish in random order; rows still follow the articles
+    client = FakeClient(jitter=0.02)
+    out = ia.analyze_articles(client, df, max_workers=workers)
+    assert client.calls == len(df), client.calls
+    pd.testing.assert_frame_equal(out, expected_rows(df))
+
+
+def check_retry(df, workdir):
+    article = df.head(1)
+    prompt = ia.build_item_impact_prompt(article["content"][0], article["date"][0], article["url"][0], ITEMS)
+
+    # Rate-limited twice, then answered: three calls, and the answer is cached
+    client = FakeClient(failures=2)
+    cache = ia.ResponseCache(os.path.join(workdir, "retry.sqlite"))
+    assert ia.get_item_impacts(client, prompt, cache=cache) == [impact_for(0)]
+    assert client.calls == 3, client.calls
+    assert cache.get(prompt, ia.MODEL) == [impact_for(0)]
+    cache.close()
+
+    # Rate-limited every time: 1 + MAX_RETRIES calls, no rows, nothing cached
+    client = FakeClient(failures=ia.MAX_RETRIES + 1)
+    cache = ia.ResponseCache(os.path.join(workdir, "exhausted.sqlite"))
+    assert ia.get_item_impacts(client, prompt, cache=cache) == []
+    assert client.calls == ia.MAX_RETRIES + 1, client.calls
+    assert cache.get(prompt, ia.MODEL) is None
+    cache.close()
+
+    # A request the API rejects outright is not retried
+    client = FakeClient(failures=1, error=BadRequestError)
+    assert ia.get_item_impacts(client, prompt) == []
+    assert client.calls == 1, client.calls
+
+
+def check_packing(df, token_budget, max_articles):
+    header = ia.build_batch_header(ITEMS)
+    blocks = [ia.build_batch_article_block(f"A{i}", c, d, u) for i, (c, d, u) in enumerate(zip(df["content"], df["date"], df["url"]))]
+    blocks.append("x" * 4 * token_budget)  # over budget on its own
+    blocks.append(blocks[0])
+    costs = [ia.estimate_tokens(b) for b in blocks]
+    header_tokens = ia.estimate_tokens(header)
+    batches = ia.pack_batches(blocks, header_tokens, token_budget, max_articles)
+
+    # Every article once, in order; each batch fits, or is a single oversize article
+    assert [i for batch in batches for i in batch] == list(range(len(blocks)))
+    for batch, following in zip(batches, batches[1:] + [None]):
+        used = header_tokens + sum(costs[i] for i in batch)
+        assert len(batch) <= max_articles, batch
+        assert used <= token_budget or len(batch) == 1, (batch, used)
+        # Greedy: the next article would not have fit
+        if following is not None:
+            assert used + costs[following[0]] > token_budget or len(batch) == max_articles, batch
+    assert [len(blocks) - 2] in batches  # the oversize article goes alone
+    return batches
+
+
+def check_batched(df, workdir, workers, token_budget, max_articles):
+    # Same rows as one request per article, with fewer requests; the oversize
+    # article is sent alone, and a rerun is served from the cache
+    long_article = df.iloc[[0]].assign(content="word " * token_budget, url="https://example.test/news/" + str(len(df)))
+    df = pd.concat([df, long_article], ignore_index=True)
+    client = FakeClient(jitter=0.02)
+    cache = ia.ResponseCache(os.path.join(workdir, "batched.sqlite"))
+    out = ia.analyze_articles_batched(client, df, cache=cache, max_workers=workers,
+                                      token_budget=token_budget, max_articles=max_articles)
+    pd.testing.assert_frame_equal(out, expected_rows(df))
+    assert 1 < client.calls < len(df), client.calls
+    assert sum(1 for prompt in client.prompts if df["url"].iloc[-1] in prompt and prompt.count("=== Article ID") == 1) == 1
+
+    calls = client.calls
+    again = ia.analyze_articles_batched(client, df, cache=cache, max_workers=workers,
+                                        token_budget=token_budget, max_articles=max_articles)
+    cache.close()
+    assert client.calls == calls, client.calls - calls
+    pd.testing.assert_frame_equal(out, again)
+    return calls
+
+
+def check_reply_ids(df):
+    # One batch whose reply skips A1, repeats A0 with a second item, and has an
+    # entry with no article_id and one with an ID outside the batch
+    def tamper(reply):
+        reply = [item for item in reply if item["article_id"] != "A1"]
+        extra = {**impact_for(1), "article_id": "A0"}
+        return reply + [extra, {**impact_for(2), "article_id": "A99"}, impact_for(3)]
+
+    df = df.head(5)
+    client = FakeClient(tamper=tamper)
+    out = ia.analyze_articles_batched(client, df, token_budget=10 ** 6)
+    assert client.calls == 1, client.calls
+
+    expected = expected_rows(df)
+    extra = expected.iloc[[0]].assign(**{k: v for k, v in impact_for(1).items()})
+    expected = pd.concat([expected.iloc[[0]], extra, expected.iloc[2:]], ignore_index=True)
+    pd.testing.assert_frame_equal(out, expected)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the impact analysis cache, retry and parallel paths against a fake LLM client.")
+    parser.add_argument("--articles", type=int, default=24)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-tokens", type=int, default=2000)
+    parser.add_argument("--max-per-batch", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df = synthetic_articles(args.articles, args.seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        check_cache(df, workdir, args.workers)
+        print(f"✅ cache: the second run over {len(df)} articles made no calls, a new article made one")
+        check_parallel_order(df, args.workers)
+        print(f"✅ parallel: {args.workers} workers, rows in article order")
+        check_retry(df, workdir)
+        print(f"✅ retry: rate limits retried until answered, given up after {ia.MAX_RETRIES} retries, bad requests not retried")
+        batches = check_packing(df, args.batch_tokens, args.max_per_batch)
+        print(f"✅ packing: {len(df) + 2} articles in {len(batches)} batches, in order, within budget, the oversize one alone")
+        calls = check_batched(df, workdir, args.workers, args.batch_tokens, args.max_per_batch)
+        print(f"✅ batched: same rows as per-article requests from {calls} requests, the rerun served from the cache")
+        check_reply_ids(df)
+        print("✅ batched replies: a missing article gets no rows, a repeated ID keeps both items, unknown IDs are dropped")
+
+
+if __name__ == "__main__":
+    main()
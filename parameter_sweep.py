@@ -0,0 +1,4 @@
+from wowah.sweep import DEFAULT_SPACE, grid, random_samples, latin_hypercube, sample_configs, run_sweep, main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from wowah.realms import MODELS, consolidate, run_sharded, main
+
+if __name__ == "__main__":
+    main()
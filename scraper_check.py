@@ -0,0 +1,252 @@
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from aiohttp import web
+
+import AH_Scraper as scraper
+from wowah.parsing import decode_monthly_response
+from wowah.store import RealmStore
+from wowah.synthetic import monthly_payloads, synthetic_market
+
+# === Parameters ===
+HOST = "127.0.0.1"
+ITEM_ID_BASE = 100  # item i is served as item id ITEM_ID_BASE + i
+
+
+# === Stub AH site ===
+# Serves the monthly JSON endpoint from canned payloads, so the direct-fetch path,
+# the incremental merge and checkpoint resume run offline. An item answers 503
+# while its id is in `down`.
+class StubSite:
+    def __init__(self, data):
+        self.names = list(data["item_name"].unique())
+        self.bodies = dict(zip(self.names, monthly_payloads(data)))
+        self.down = set()
+        self.hits = 0
+        self.port = None
+        self._ready = threading.Event()
+
+    def item_urls(self, region="eu", realm="burning-legion"):
+        return [
+            f"http://{HOST}:{self.port}/{region}/{realm}/item/{name.replace(' ', '%20')}-{ITEM_ID_BASE + i}"
+            for i, name in enumerate(self.names)
+        ]
+
+    @property
+    def template(self):
+        return f"http://{HOST}:{self.port}/api/{{region}}/{{realm}}/item/{{item_id}}/monthly"
+
+    async def monthly(self, request):
+        self.hits += 1
+        item_id = request.match_info["item_id"]
+        if item_id in self.down:
+            raise web.HTTPServiceUnavailable()
+        return web.Response(body=self.bodies[self.names[int(item_id) - ITEM_ID_BASE]])
+
+    def start(self):
+        threading.Thread(target=self._serve, daemon=True).start()
+        self._ready.wait(10)
+        return self
+
+    def _serve(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        app = web.Application()
+        app.router.add_get("/api/{region}/{realm}/item/{item_id}/monthly", self.monthly)
+        runner = web.AppRunner(app)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, HOST, 0)
+        loop.run_until_complete(site.start())
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        loop.run_forever()
+
+
+# === Fake browser ===
+# Stands in for a selenium-wire Chrome: get() opens an item page, and the page's
+# monthly XHR is answered by the stub site, so a down item fails the fetch.
+class FakeDriver:
+    def __init__(self, site):
+        self.site = site
+        self.url = None
+        self.quit_called = False
+
+    def get(self, url):
+        self.url = url
+
+    def monthly_body(self):
+        with urllib.request.urlopen(scraper.endpoint_for(self.site.template, self.url), timeout=10) as resp:
+            return resp.read()
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeBrowser:
+    # Driver factory plus fetch for BrowserPool; records every driver and how many are busy at once
+    def __init__(self, site, size):
+        self.site = site
+        self.drivers = []
+        self.busy = set()
+        self.max_busy = 0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self._barrier = threading.Barrier(size, timeout=10)  # the first wave only passes if all drivers are out together
+
+    def new_driver(self):
+        driver = FakeDriver(self.site)
+        self.drivers.append(driver)
+        return driver
+
+    def fetch(self, driver, url):
+        with self._lock:
+            assert driver not in self.busy and not driver.quit_called, "driver handed out twice or after quit"
+            self.busy.add(driver)
+            self.max_busy = max(self.max_busy, len(self.busy))
+            self.calls += 1
+            first_wave = self.calls <= self._barrier.parties
+        try:
+            if first_wave:
+                try:
+                    self._barrier.wait()
+                except threading.BrokenBarrierError:
+                    pass
+            driver.get(url)
+            return decode_monthly_response(driver.monthly_body())
+        finally:
+            with self._lock:
+                self.busy.discard(driver)
+
+
+# === Checks ===
+def check_endpoint_template(site):
+    urls = site.item_urls()
+    xhr_url = site.template.format(region="eu", realm="burning-legion", item_id=ITEM_ID_BASE)
+    assert scraper.learn_endpoint_template(urls[0], xhr_url) == site.template
+    assert scraper.endpoint_for(site.template, urls[1]).endswith(f"/item/{ITEM_ID_BASE + 1}/monthly")
+
+
+def check_fetch_json_items(site, data):
+    urls = site.item_urls()
+    site.down = {str(ITEM_ID_BASE + 1)}
+    results = asyncio.run(scraper.fetch_json_items(urls, site.template, concurrency=2))
+    site.down = set()
+
+    assert [url for url, _, _ in results] == urls
+    for url, df, error in results:
+        name = site.names[urls.index(url)]
+        if name == site.names[1]:
+            assert df is None and error is not None, (url, error)
+            continue
+        assert error is None, (url, error)
+        expected = decode_monthly_response(site.bodies[name])
+        pd.testing.assert_frame_equal(df.reset_index(drop=True), expected.reset_index(drop=True))
+        assert len(df) == (data["item_name"] == name).sum()
+    return len(results)
+
+
+def check_new_rows_only(site, store_path):
+    store = RealmStore(store_path)
+    df = decode_monthly_response(site.bodies[site.names[0]])
+    df["region"], df["realm"] = "eu", "burning-legion"
+
+    # Everything is new at first, duplicates collapse to one row
+    fresh = scraper.new_rows_only(store, pd.concat([df, df.tail(3)], ignore_index=True))
+    assert len(fresh) == len(df), (len(fresh), len(df))
+    store.append(df.head(len(df) // 2))
+
+    # Only rows past the stored high-water mark survive
+    fresh = scraper.new_rows_only(store, df)
+    assert len(fresh) == len(df) - len(df) // 2
+    assert fresh["timestamp"].min() > store.high_water_mark(site.names[0])
+    assert scraper.new_rows_only(store, df.iloc[:0]).empty
+
+
+def check_browser_pool(site, size):
+    # The pool lends `size` drivers at once, takes each back, swaps out the one behind
+    # a failed fetch and quits every driver on close
+    urls = site.item_urls()
+    browser = FakeBrowser(site, size)
+    site.down = {str(ITEM_ID_BASE + 1)}
+    results = {}
+    with scraper.BrowserPool(size, driver_factory=browser.new_driver, fetch=browser.fetch) as pool:
+        with ThreadPoolExecutor(max_workers=size) as executor:
+            futures = {url: executor.submit(pool.fetch, url) for url in urls}
+        for url, future in futures.items():
+            results[url] = future.exception() or future.result()
+        assert not browser.busy and pool._idle.qsize() == size
+    site.down = set()
+
+    assert browser.max_busy == size, browser.max_busy
+    assert not browser._barrier.broken, "drivers were not handed out concurrently"
+    assert isinstance(results[urls[1]], Exception), results[urls[1]]
+    for i, url in enumerate(urls):
+        if i == 1:
+            continue
+        expected = decode_monthly_response(site.bodies[site.names[i]])
+        pd.testing.assert_frame_equal(results[url].reset_index(drop=True), expected.reset_index(drop=True))
+    assert len(browser.drivers) == size + 1, len(browser.drivers)  # one replacement for the failed fetch
+    assert all(driver.quit_called for driver in browser.drivers)
+    return len(urls)
+
+
+def check_resume(site, workdir):
+    # A run with one item down keeps the checkpoint; --resume fetches only that item
+    urls = site.item_urls()
+    with open(os.path.join(workdir, "items.txt"), "w") as f:
+        f.write("\n".join(urls))
+    args = ["--store", "store", "--items-file", "items.txt", "--direct", "--endpoint-template", site.template]
+
+    site.down = {str(ITEM_ID_BASE + 2)}
+    scraper.main(args)  # the browser fallback fails too: no selenium-wire, or no Monthly button on the stub page
+    with open(scraper.CHECKPOINT_PATH) as f:
+        done = set(json.load(f)["done"])
+    assert done == set(urls) - {urls[2]}, done
+
+    site.down = set()
+    hits = site.hits
+    scraper.main(args + ["--resume"])
+    assert site.hits == hits + 1, site.hits - hits
+    assert not os.path.exists(scraper.CHECKPOINT_PATH)
+    stored = RealmStore("store").info()
+    assert set(stored["item_name"]) == set(site.names), stored
+    return len(urls)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the AH scraper's direct-fetch, merge and resume paths against a local stub site.")
+    parser.add_argument("--items", type=int, default=4)
+    parser.add_argument("--snapshots", type=int, default=24 * 7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pool", type=int, default=2, help="fake browsers in the pool check")
+    args = parser.parse_args(argv)
+
+    data = synthetic_market(args.items, args.snapshots, args.seed)
+    site = StubSite(data).start()
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # the scraper's checkpoint and store paths are relative
+        try:
+            check_endpoint_template(site)
+            print("✅ endpoint template learned from an intercepted URL")
+            n = check_fetch_json_items(site, data)
+            print(f"✅ direct fetch: {n - 1} items decoded, the unavailable one reported as an error")
+            check_new_rows_only(site, "merge_store")
+            print("✅ incremental merge keeps only rows past the high-water mark")
+            n = check_browser_pool(site, args.pool)
+            print(f"✅ browser pool: {args.pool} drivers lent at once, all returned, all quit on close despite a failed fetch")
+            n = check_resume(site, workdir)
+            print(f"✅ checkpoint resume: {n} items stored, the resumed run fetched only the failed one")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,212 @@
+import argparse
+import json
+import os
 import pandas as pd
 import numpy as np
-import importlib.util
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 
-# === Load simulator scripts ===
-def load_simulator(path, class_name="WoWAHTraderReinvesting"):
-    spec = importlib.util.spec_from_file_location("simulator_module", path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return getattr(module, class_name)
+from wowah import InsightfulTrader, MarketData, VanillaTrader
+from wowah.batched import BatchedTrader
+from wowah.profiling import Profiler, aggregate_reports
+from wowah.store import load_market_data
 
 # === Parameters ===
-DATA_PATH = "aggregated_wow_ah_monthly.csv"
 INSIGHT_PATH = "wowhead_interpreted_item_impacts.xlsx"
-INSIGHTS_SIM_PATH = "C:/Users/batki/Desktop/RSM/FinTech/Simulator w Insights.py"
-NO_INSIGHTS_SIM_PATH = "C:/Users/batki/Desktop/RSM/FinTech/Simulator.py"
 N_RUNS = 30
-
-# === Load data ===
-df = pd.read_csv(DATA_PATH)
-impact_df = pd.read_excel(INSIGHT_PATH)
-
-# === Inject market noise into quantity ===
-df["quantity"] = df["quantity"] * np.random.uniform(0.8, 1.2, size=len(df))
-df["quantity"] = df["quantity"].astype(int)
-
-# === Preprocess insight scores ===
-impact_summary = (
-    impact_df.groupby("affected_item")["impact_score"]
-    .mean()
-    .reset_index()
-)
-impact_scores = dict(zip(impact_summary["affected_item"].str.lower(), impact_summary["impact_score"]))
-
-# === Load simulator classes ===
-InsightfulTrader = load_simulator(INSIGHTS_SIM_PATH)
-VanillaTrader = load_simulator(NO_INSIGHTS_SIM_PATH)
-
-# === Run multiple simulations ===
-def run_batch(sim_class, label, use_insights=False):
-    results = []
-    for i in range(N_RUNS):
-        # Randomize quantity noise each run for variability
-        df["quantity"] = df["quantity"] * np.random.uniform(0.8, 1.2, size=len(df))
-        df["quantity"] = df["quantity"].astype(int)
-
-        if use_insights:
-            trader = sim_class(df, impact_scores)
-        else:
-            trader = sim_class(df)
-
+SEED = 42
+NOISE_RANGE = (0.8, 1.2)  # multiplicative market quantity noise per run
+ENGINES = ("batched", "trader")  # runs advanced together per chunk, or one trader per run
+PROFILE_PATH = "simulator_comparison_profile.json"
+
+# === Worker state ===
+# Filled once per worker process by init_worker, so the featurized frame is
+# shipped to each worker a single time instead of once per run.
+_worker = {}
+
+def init_worker(features, last_prices, impact_scores, profile=None):
+    _worker["features"] = features
+    _worker["last_prices"] = last_prices
+    _worker["impact_scores"] = impact_scores
+    _worker["profile"] = profile  # None, or {"memory": bool}
+
+def new_profiler():
+    profile = _worker["profile"]
+    return Profiler(enabled=profile is not None, memory=bool(profile and profile["memory"]))
+
+def run_single(label, run, seed):
+    features = _worker["features"]
+
+    # Each run owns its generator, so results do not depend on worker count or scheduling
+    # The noise is a per-run quantity overlay; the shared market data is never copied
+    rng = np.random.default_rng(seed)
+    noise = rng.uniform(*NOISE_RANGE, size=len(features))
+    quantity = (features.quantity * noise).astype(int)
+
+    prof = new_profiler()
+    if label == "With Insights":
+        trader = InsightfulTrader(features, _worker["impact_scores"], log_trades=False, quantity=quantity, profiler=prof)
+    else:
+        trader = VanillaTrader(features, engine="numpy", log_trades=False, quantity=quantity, profiler=prof)
+
+    trader.simulate()
+    final_gold = trader.gold
+    portfolio_val = trader.portfolio_value(_worker["last_prices"])
+    return {
+        "model": label,
+        "run": run,
+        "final_gold": final_gold,
+        "portfolio_value": portfolio_val,
+        "total_value": final_gold + portfolio_val,
+        "profile": prof.report() if prof.enabled else None,
+    }
+
+def run_chunk(label, runs, seeds):
+    # Same noise as run_single, but the whole chunk shares one timeline walk
+    features = _worker["features"]
+    quantity = features.quantity
+    noisy = np.stack([
+        (quantity * np.random.default_rng(seed).uniform(*NOISE_RANGE, size=len(features))).astype(int)
+        for seed in seeds
+    ])
+    impact_scores = _worker["impact_scores"] if label == "With Insights" else None
+    prof = new_profiler()
+    trader = BatchedTrader(features, [{}], quantity=noisy, impact_scores=impact_scores)
+    with prof.phase("batched_simulate"):
         trader.simulate()
-        last_prices = df.groupby("item_name")["market_value"].last().to_dict()
-        final_gold = trader.gold
-        portfolio_val = trader.portfolio_value(last_prices)
-        results.append({
+    prof.count("runs", len(runs))
+    prof.count("rows", len(features))
+    prof.count("trades", trader.trades.sum())
+    out = trader.results(_worker["last_prices"])
+    rows = [
+        {
             "model": label,
-            "run": i+1,
+            "run": run,
             "final_gold": final_gold,
             "portfolio_value": portfolio_val,
-            "total_value": final_gold + portfolio_val
-        })
-    return pd.DataFrame(results)
-
-# === Collect results ===
-print("\u23F3 Running simulations without insights...")
-vanilla_df = run_batch(VanillaTrader, "No Insights", use_insights=False)
-
-print("\u23F3 Running simulations with insights...")
-insight_df = run_batch(InsightfulTrader, "With Insights", use_insights=True)
-
-# === Combine and export ===
-combined = pd.concat([vanilla_df, insight_df], ignore_index=True)
-combined.to_csv("simulator_comparison_results.csv", index=False)
-
-# === Summary stats ===
-summary = combined.groupby("model")[["final_gold", "portfolio_value", "total_value"]].agg(["mean", "std"])
-print("\n\U0001F4CA Simulation Comparison Summary:")
-print(summary)
-
-# === Plot ===
-plt.figure(figsize=(8, 5))
-metrics = ["final_gold", "portfolio_value", "total_value"]
-x = np.arange(len(metrics))
-bar_width = 0.35
-
-grouped = combined.groupby("model")[metrics].agg(["mean", "std"])
-models = grouped.index.tolist()
-
-for i, model in enumerate(models):
-    means = grouped.loc[model].xs("mean", level=1)
-    stds = grouped.loc[model].xs("std", level=1)
-    plt.bar(x + i * bar_width, means, bar_width, yerr=stds, capsize=5, label=model)
-
-plt.xticks(x + bar_width / 2, ["Final Gold", "Portfolio", "Total"])
-plt.ylabel("Gold Value")
-plt.title("Simulator Performance Comparison (N=30)")
-plt.legend()
-plt.grid(True, axis="y", linestyle="--", alpha=0.5)
-plt.tight_layout()
-plt.savefig("simulator_model_comparison.png")
-plt.show()
+            "total_value": final_gold + portfolio_val,
+            "profile": None,
+        }
+        for run, final_gold, portfolio_val in zip(runs, out["final_gold"].tolist(), out["total_value"].tolist())
+    ]
+    if prof.enabled:
+        rows[0]["profile"] = prof.report()  # one report per chunk
+    return rows
+
+# === Run multiple simulations ===
+def run_batch(executor, label, run_seeds, chunksize=1, engine="trader"):
+    # Returns the per-run results and the profiler reports (empty unless profiling)
+    runs = list(range(1, len(run_seeds) + 1))
+    if engine == "batched":
+        starts = range(0, len(run_seeds), chunksize)
+        parts = executor.map(
+            run_chunk,
+            [label] * len(starts),
+            [runs[i:i + chunksize] for i in starts],
+            [run_seeds[i:i + chunksize] for i in starts],
+        )
+        rows = [row for part in parts for row in part]
+    else:
+        rows = list(executor.map(run_single, [label] * len(run_seeds), runs, run_seeds, chunksize=chunksize))
+    profiles = [row.pop("profile") for row in rows]
+    return pd.DataFrame(rows), [p for p in profiles if p is not None]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo comparison of the trader with and without insights.")
+    parser.add_argument("--runs", type=int, default=N_RUNS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--engine", choices=ENGINES, default="batched")
+    parser.add_argument("--data", help="price store directory or CSV (default: ah_store/ if present, else the CSV)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"profile every run and write the aggregate to {PROFILE_PATH} (also enabled by WOWAH_PROFILE=1)")
+    parser.add_argument("--profile-memory", action="store_true", help="--profile plus tracemalloc peak memory")
+    args = parser.parse_args(argv)
+
+    env = Profiler.from_env()
+    profile = None
+    if args.profile or args.profile_memory or env.enabled:
+        profile = {"memory": args.profile_memory or env.memory}
+
+    # === Load data ===
+    df = load_market_data(args.data)
+    impact_df = pd.read_excel(INSIGHT_PATH)
+
+    # === Preprocess insight scores ===
+    impact_summary = (
+        impact_df.groupby("affected_item")["impact_score"]
+        .mean()
+        .reset_index()
+    )
+    impact_scores = dict(zip(impact_summary["affected_item"].str.lower(), impact_summary["impact_score"]))
+
+    # === Compute MA7 / deviation features once for every run ===
+    # Noise only touches quantity, so the price features are shared by all runs
+    features = MarketData.from_frame(df)
+    last_prices = df.groupby("item_name", observed=True)["market_value"].last().to_dict()
+
+    # Common random numbers: run i sees the same quantity noise under both models
+    run_seeds = np.random.SeedSequence(args.seed).spawn(args.runs)
+    if args.engine == "batched":
+        chunksize = -(-args.runs // args.workers)  # one batched pass per worker
+    else:
+        chunksize = max(1, args.runs // (4 * args.workers))
+
+    # === Collect results ===
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=init_worker,
+        initargs=(features, last_prices, impact_scores, profile),
+    ) as executor:
+        print("\u23F3 Running simulations without insights...")
+        vanilla_df, vanilla_profiles = run_batch(executor, "No Insights", run_seeds, chunksize, args.engine)
+
+        print("\u23F3 Running simulations with insights...")
+        insight_df, insight_profiles = run_batch(executor, "With Insights", run_seeds, chunksize, args.engine)
+
+    # === Profile report: per phase and counter, totals and spread across runs ===
+    if profile is not None:
+        report = {
+            "engine": args.engine,
+            "runs": args.runs,
+            "No Insights": aggregate_reports(vanilla_profiles),
+            "With Insights": aggregate_reports(insight_profiles),
+        }
+        with open(PROFILE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\u23F1\uFE0F Profile written to {PROFILE_PATH}")
+
+    # === Combine and export ===
+    combined = pd.concat([vanilla_df, insight_df], ignore_index=True)
+    combined.to_csv("simulator_comparison_results.csv", index=False)
+
+    # === Summary stats ===
+    summary = combined.groupby("model")[["final_gold", "portfolio_value", "total_value"]].agg(["mean", "std"])
+    print("\n\U0001F4CA Simulation Comparison Summary:")
+    print(summary)
+
+    # === Plot ===
+    plt.figure(figsize=(8, 5))
+    metrics = ["final_gold", "portfolio_value", "total_value"]
+    x = np.arange(len(metrics))
+    bar_width = 0.35
+
+    grouped = combined.groupby("model")[metrics].agg(["mean", "std"])
+    models = grouped.index.tolist()
+
+    for i, model in enumerate(models):
+        means = grouped.loc[model].xs("mean", level=1)
+        stds = grouped.loc[model].xs("std", level=1)
+        plt.bar(x + i * bar_width, means, bar_width, yerr=stds, capsize=5, label=model)
+
+    plt.xticks(x + bar_width / 2, ["Final Gold", "Portfolio", "Total"])
+    plt.ylabel("Gold Value")
+    plt.title(f"Simulator Performance Comparison (N={args.runs})")
+    plt.legend()
+    plt.grid(True, axis="y", linestyle="--", alpha=0.5)
+    plt.tight_layout()
+    plt.savefig("simulator_model_comparison.png")
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+from wowah.walk_forward import make_folds, TrailingMA, walk_forward, summarize, main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from wowah.simulator_v2 import INITIAL_GOLD, generate_signals, simulate
+from wowah.synthetic import synthetic_market
+from wowah.walk_forward import MA_WINDOW, make_folds, walk_forward
+
+# === Parameters ===
+TRAIN_LEN = "4D"
+TEST_LEN = "2D"
+STEP = "2D"
+
+
+# === Datasets ===
+def flatten_tail(data, start):
+    # Every item's price frozen at its value at `start`: folds testing after it see no signals
+    data = data.copy()
+    data["timestamp"] = pd.to_datetime(data["timestamp"])
+    frozen = data["timestamp"] >= start
+    last = data[data["timestamp"] <= start].groupby("item_name")["market_value"].last()
+    data.loc[frozen, "market_value"] = data.loc[frozen, "item_name"].map(last)
+    return data
+
+
+# === Checks ===
+def check_against_half_half(data, folds_df):
+    # Each fold must match the V2 strategy run on that fold's own train/test split
+    data = data.assign(timestamp=pd.to_datetime(data["timestamp"])).sort_values("timestamp", kind="stable")
+    for fold in folds_df.to_dict("records"):
+        train = data[(data["timestamp"] >= fold["train_start"]) & (data["timestamp"] <= fold["train_end"])]
+        test = data[(data["timestamp"] > fold["train_end"]) & (data["timestamp"] <= fold["test_end"])]
+        signals = generate_signals(train, test, MA_WINDOW)
+        trade_log, portfolio = simulate(signals, test)
+        total = portfolio["total_value"].iloc[-1] if len(portfolio) else INITIAL_GOLD
+        assert fold["signals"] == len(signals), (fold["fold"], fold["signals"], len(signals))
+        assert fold["trades"] == len(trade_log), (fold["fold"], fold["trades"], len(trade_log))
+        assert np.isclose(fold["total_value"], total), (fold["fold"], fold["total_value"], total)
+
+
+def check_zero_signal_folds(folds_df):
+    quiet = folds_df[folds_df["signals"] == 0]
+    assert len(quiet), "expected at least one fold without signals"
+    assert (quiet["trades"] == 0).all() and (quiet["final_gold"] == INITIAL_GOLD).all()
+    assert (quiet["return_pct"] == 0).all(), quiet
+    return len(quiet)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the walk-forward folds against per-fold half/half runs, "
+                                                 "including folds that produce no signals.")
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--snapshots", type=int, default=24 * 21)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    data = synthetic_market(args.items, args.snapshots, args.seed)
+    start = pd.to_datetime(data["timestamp"]).min()
+    datasets = {
+        "synthetic, flat tail": flatten_tail(data, start + pd.Timedelta("12D")),
+        "flat prices": flatten_tail(data, start),
+    }
+    for label, market in datasets.items():
+        folds_df, _ = walk_forward(market, TRAIN_LEN, TEST_LEN, STEP, MA_WINDOW, args.workers)
+        assert len(folds_df) == len(make_folds(start, pd.to_datetime(market["timestamp"]).max(), TRAIN_LEN, TEST_LEN, STEP))
+        check_against_half_half(market, folds_df)
+        quiet = check_zero_signal_folds(folds_df)
+        print(f"✅ {label}: {len(folds_df)} folds match per-fold half/half runs, {quiet} without signals")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+from wowah.features import prepare_market_data
+from wowah.market import MarketData
+from wowah.simulator import WoWAHTraderReinvesting as VanillaTrader
+from wowah.simulator_insights import WoWAHTraderReinvesting as InsightfulTrader
+from wowah.simulator_insights import load_impact_scores
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from wowah.impact_signal import HALF_LIFE, decayed_impact
+from wowah.market import MarketData
+from wowah.params import resolve_params
+from wowah.simulator import STARTING_GOLD
+
+
+# === Batched trader: K runs advanced together through one timeline ===
+# Each of the K runs has its own strategy parameters and, optionally, its own
+# quantity realization (Monte Carlo noise). Gold is a (K,) array and inventory
+# is a pair of (K, items) arrays. Every candidate row is visited once, and the
+# buy/sell decision for all K runs is made with broadcasting.
+#
+# The rules and their evaluation order (per timestamp: SELLs in row order, then
+# BUYs) are those of the traders, so run k ends with the gold and inventory a
+# single trader with configs[k] would reach. Only per-run trade counts are kept,
+# not trade logs.
+class BatchedTrader:
+    def __init__(self, features, configs, quantity=None, impact_scores=None, half_life=HALF_LIFE, item_graph=None):
+        # features: MarketData (or a prepare_market_data frame) shared by all runs
+        # configs: list of K parameter dicts, all with the same ma_window
+        # quantity: optional (K, rows) server quantities, one row per run
+        # impact_scores: when given, apply the insight trader's buy bias; a
+        #   dated_impacts() frame is decayed with half_life, as in the trader
+        # item_graph: optional ItemGraph whose linked scores join the buy bias
+        configs = [resolve_params(c) for c in configs]
+        if quantity is not None:
+            quantity = np.asarray(quantity)
+            if len(configs) == 1:
+                configs = configs * quantity.shape[0]
+            if quantity.shape != (len(configs), len(features)):
+                raise ValueError(f"quantity has shape {quantity.shape}, expected ({len(configs)}, {len(features)})")
+        if len({c["ma_window"] for c in configs}) > 1:
+            raise ValueError("All configs in a batch must share one ma_window; group them by window first")
+        if not isinstance(features, MarketData):
+            features = MarketData.from_prepared(features, configs[0]["ma_window"])
+
+        self.features = features
+        self.configs = configs
+        self.quantity = quantity
+        self.impact_scores = impact_scores
+        self.half_life = half_life
+        self.item_graph = item_graph
+        self.items = None
+        self.gold = np.full(len(configs), STARTING_GOLD, dtype=float)
+        self.inv_qty = None
+        self.inv_cost = None
+        self.trades = np.zeros(len(configs), dtype=np.int64)
+
+    def _rule_tables(self):
+        # Per-run thresholds and hour/day lookup tables, indexed [k, dow, hour] / [k, hour]
+        K = len(self.configs)
+        sell_time = np.zeros((K, 7, 24), dtype=bool)
+        buy_hour = np.zeros((K, 24), dtype=bool)
+        for k, c in enumerate(self.configs):
+            sell_time[k][np.ix_(c["sell_days"], c["sell_hours"])] = True
+            buy_hour[k, list(c["buy_hours"])] = True
+        column = lambda key: np.array([c[key] for c in self.configs], dtype=float)
+        return {
+            "sell_threshold": column("sell_threshold"),
+            "buy_threshold": column("buy_threshold"),
+            "max_sell_fraction": column("max_sell_fraction"),
+            "buy_budget_fraction": column("buy_budget_fraction"),
+            "sell_time": sell_time,
+            "buy_hour": buy_hour,
+        }
+
+    def simulate(self):
+        market = self.features
+        rules = self._rule_tables()
+        ts = market.timestamps.asi8
+        price = market.market_value.astype(float, copy=False)
+        deviation = market.deviation.astype(float, copy=False)
+        valid = ~market.timestamps.isna()  # groupby drops NaT keys
+        hour = np.where(valid, market.hour, 0).astype(int)
+        dow = np.where(valid, market.dow, 0).astype(int)
+        reset = market.weekly_reset != 0
+        codes = market.item_codes
+        self.items = market.items
+        starts = np.flatnonzero(np.r_[True, ts[1:] != ts[:-1]])
+
+        # A row is visited when it is a candidate for at least one run
+        sell = valid & (
+            (deviation > rules["sell_threshold"].min()) | rules["sell_time"].any(axis=0)[dow, hour]
+        )
+        buy = valid & (deviation < rules["buy_threshold"].max()) & (rules["buy_hour"].any(axis=0)[hour] | reset)
+
+        rows = np.concatenate([np.flatnonzero(sell), np.flatnonzero(buy)])
+        is_buy = np.r_[np.zeros(sell.sum(), dtype=bool), np.ones(buy.sum(), dtype=bool)]
+        group = np.searchsorted(starts, rows, side="right")
+        order = np.lexsort((rows, is_buy, group))
+        rows, is_buy = rows[order], is_buy[order]
+
+        K = len(self.configs)
+        gold, trades = self.gold, self.trades
+        inv_qty = np.zeros((K, len(self.items)), dtype=np.int64)
+        inv_cost = np.zeros((K, len(self.items)), dtype=float)
+
+        if self.quantity is None:
+            server_qty = market.quantity[rows].tolist()
+        else:
+            server_qty = list(np.ascontiguousarray(self.quantity[:, rows].T))
+        if self.impact_scores is None:
+            multiplier = [None] * len(rows)
+        else:
+            multiplier = (1 + self._impact(market, rows) / 10).tolist()
+
+        sell_threshold, buy_threshold = rules["sell_threshold"], rules["buy_threshold"]
+        sell_fraction, budget_fraction = rules["max_sell_fraction"], rules["buy_budget_fraction"]
+        sell_time, buy_hour = rules["sell_time"], rules["buy_hour"]
+
+        events = zip(
+            codes[rows].tolist(), is_buy.tolist(), price[rows].tolist(), deviation[rows].tolist(),
+            hour[rows].tolist(), dow[rows].tolist(), reset[rows].tolist(), server_qty, multiplier,
+        )
+        for code, buying, price_i, dev, hr, dw, rst, qty_i, mult in events:
+            held = inv_qty[:, code]
+            if not buying:
+                sell_qty = np.minimum(held, (sell_fraction * qty_i).astype(np.int64))
+                ok = ((dev > sell_threshold) | sell_time[:, dw, hr]) & (sell_qty > 0)
+                if not ok.any():
+                    continue
+                held[ok] -= sell_qty[ok]
+                inv_cost[ok & (held == 0), code] = 0
+                gold[ok] += sell_qty[ok] * price_i
+            else:
+                ok = (dev < buy_threshold) & (buy_hour[:, hr] | rst)
+                if not ok.any():
+                    continue
+                budget = budget_fraction * gold
+                if mult is not None:
+                    budget = budget * mult
+                qty = np.minimum(qty_i, np.floor_divide(budget, price_i).astype(np.int64))
+                cost = qty * price_i
+                ok &= qty > 0
+                if mult is not None:
+                    ok &= ~(cost > gold)  # the insight trader skips unaffordable buys
+                if not ok.any():
+                    continue
+                new_qty = held[ok] + qty[ok]
+                inv_cost[ok, code] = (inv_cost[ok, code] * held[ok] + cost[ok]) / new_qty
+                held[ok] = new_qty
+                gold[ok] -= cost[ok]
+            trades += ok
+
+        self.inv_qty, self.inv_cost = inv_qty, inv_cost
+
+    def _impact(self, market, rows):
+        # The insight trader's impact_score (+ linked_impact) at the visited rows
+        codes = market.item_codes
+        take = rows if self.item_graph is None else slice(None)  # propagation needs whole timestamps
+        if isinstance(self.impact_scores, pd.DataFrame):
+            names = np.asarray(market.items, dtype=object)[codes[take]]
+            impact = decayed_impact(market.timestamps[take], names, self.impact_scores, self.half_life)
+        else:
+            per_item = pd.Series(market.items, dtype=object).map(self.impact_scores).astype(float).fillna(0).to_numpy()
+            impact = per_item[codes[take]]
+        if self.item_graph is not None:
+            names = np.asarray(market.items, dtype=object)[codes]
+            impact = (impact + self.item_graph.linked_scores(market.timestamps, names, impact, market.deviation))[rows]
+        return impact
+
+    def results(self, current_prices):
+        # Held items without a current price are valued at their cost basis, as in portfolio_value()
+        prices = np.array([current_prices.get(item, np.nan) for item in self.items], dtype=float)
+        prices = np.where(np.isnan(prices), self.inv_cost, prices)
+        holdings = (self.inv_qty * prices).sum(axis=1)
+        return pd.DataFrame({
+            "trades": self.trades,
+            "final_gold": self.gold,
+            "holdings_value": holdings,
+            "total_value": self.gold + holdings,
+        })
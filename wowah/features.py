@@ -0,0 +1,23 @@
+import pandas as pd
+
+from wowah.params import DEFAULT_PARAMS
+
+
+# === Market features shared by both traders ===
+def prepare_market_data(data, ma_window=DEFAULT_PARAMS["ma_window"]):
+    df = data.copy()
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    if "quantity" in df.columns:
+        # A missing listing size means nothing is listed: no fills, no sells
+        df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce").fillna(0)
+    df.sort_values(["timestamp", "item_name"], inplace=True)
+    df["hour"] = df["timestamp"].dt.hour
+    df["dow"] = df["timestamp"].dt.dayofweek
+    df["weekly_reset"] = ((df["dow"] == 2) & df["hour"].between(8, 12)).astype(int)
+    ma_col = f"ma{ma_window}"
+    df[ma_col] = (
+        df.groupby("item_name", observed=True)["market_value"]
+        .transform(lambda x: x.rolling(ma_window, min_periods=1).mean().shift(1))
+    )
+    df["deviation"] = (df["market_value"] - df[ma_col]) / df[ma_col]
+    return df
@@ -0,0 +1,308 @@
+import argparse
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+from tqdm import tqdm
+
+# === Setup ===
+INPUT_PATH = "wowhead_articles_with_dates.xlsx"
+OUTPUT_PATH = "wowhead_interpreted_item_impacts.xlsx"
+CACHE_PATH = "llm_cache.sqlite"
+MODEL = "gpt-4o-mini"
+MAX_WORKERS = 8
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0  # seconds, doubled per retry
+BACKOFF_MAX = 60.0
+BATCH_TOKEN_BUDGET = 6000  # prompt tokens per batched request
+MAX_ARTICLES_PER_BATCH = 20
+
+# Define portfolio items
+portfolio_items = [
+    "Profaned Tinderbox",
+    "Bismuth",
+    "Leystone Ore",
+    "Shal'dorei Silk",
+    "Lightless Silk",
+    "Vibrant Wildercloth Bolt",
+    "Resilient Leather",
+    "Glowing Titan Orb",
+    "Ironclaw Ore",
+    "Orbinid"
+]
+
+# === Prompt builder ===
+def build_item_impact_prompt(article_text, date, url, portfolio_items):
+    item_list = "\n".join(f"- {item}" for item in portfolio_items)
+    return f"""
+You are a seasoned World of Warcraft economy analyst. You only care about RETAIL WoW and must ignore Classic entirely.
+
+Below is a list of specific items currently being tracked in our investment portfolio:
+{item_list}
+
+Your task is to read the following news article and determine if ANY of the portfolio items above may be economically affected in terms of supply, demand, or price. You should also take a more holistic interpretation of the news, reasoning deeply about things such as players returning and how that might affect supply and demand.
+
+For each relevant portfolio item, return:
+- "affected_item": the item affected
+- "interpretation": a short explanation of the economic impact (e.g., higher demand due to crafting)
+- "impact_score": a number from -5 (very negative price effect) to +5 (very positive price effect)
+
+If an item has no direct implication in the article, do NOT include it.
+
+Article date: {date}
+URL: {url}
+
+Article:
+\"\"\"
+{article_text}
+\"\"\"
+
+Return your answer as a JSON array of objects. Format:
+[
+  {{ "affected_item": "Leystone Ore", "interpretation": "...", "impact_score": 2 }},
+  {{ "affected_item": "Glowing Titan Orb", "interpretation": "...", "impact_score": 3 }}
+]
+"""
+
+# === Batched prompt builder ===
+# The analyst instructions and portfolio list dominate short articles, so a
+# batch sends them once and tags each article with an ID to split the answer.
+def build_batch_header(portfolio_items):
+    item_list = "\n".join(f"- {item}" for item in portfolio_items)
+    return f"""
+You are a seasoned World of Warcraft economy analyst. You only care about RETAIL WoW and must ignore Classic entirely.
+
+Below is a list of specific items currently being tracked in our investment portfolio:
+{item_list}
+
+You will be given several news articles, each marked with an Article ID. For EACH article independently, determine if ANY of the portfolio items above may be economically affected in terms of supply, demand, or price. You should also take a more holistic interpretation of the news, reasoning deeply about things such as players returning and how that might affect supply and demand.
+
+For each relevant portfolio item in each article, return:
+- "article_id": the Article ID the impact comes from
+- "affected_item": the item affected
+- "interpretation": a short explanation of the economic impact (e.g., higher demand due to crafting)
+- "impact_score": a number from -5 (very negative price effect) to +5 (very positive price effect)
+
+If an item has no direct implication in an article, do NOT include it. Articles with no affected items produce no entries.
+
+Return your answer as a single JSON array of objects. Format:
+[
+  {{ "article_id": "A0", "affected_item": "Leystone Ore", "interpretation": "...", "impact_score": 2 }},
+  {{ "article_id": "A3", "affected_item": "Glowing Titan Orb", "interpretation": "...", "impact_score": 3 }}
+]
+"""
+
+def build_batch_article_block(article_id, article_text, date, url):
+    return f"""
+=== Article ID: {article_id} ===
+Article date: {date}
+URL: {url}
+\"\"\"
+{article_text}
+\"\"\"
+"""
+
+def estimate_tokens(text):
+    # ~4 characters per token for English prose; good enough for packing
+    return len(text) // 4 + 1
+
+def pack_batches(blocks, header_tokens, token_budget=BATCH_TOKEN_BUDGET, max_articles=MAX_ARTICLES_PER_BATCH):
+    # Greedy in article order; an article over budget on its own still gets a batch
+    batches, current, used = [], [], header_tokens
+    for i, block in enumerate(blocks):
+        cost = estimate_tokens(block)
+        if current and (used + cost > token_budget or len(current) >= max_articles):
+            batches.append(current)
+            current, used = [], header_tokens
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+# === Response cache ===
+# Content-addressed: the key is a hash of model + prompt, the value the parsed JSON.
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model TEXT, response TEXT, created REAL)"
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def key(prompt, model):
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, prompt, model):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (self.key(prompt, model),)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def put(self, prompt, model, value):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (self.key(prompt, model), model, json.dumps(value), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# === GPT call with fallback JSON parse ===
+def parse_impacts(content):
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        print("⚠️ JSON decode failed, using fallback...")
+        cleaned = content.strip().strip("```json").strip("```").strip()
+        return json.loads(cleaned)
+
+def is_retryable(error):
+    # Rate limits, server errors and dropped connections are worth another try
+    status = getattr(error, "status_code", None)
+    if status == 429 or (status is not None and status >= 500):
+        return True
+    return type(error).__name__ in ("RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError")
+
+def backoff_delay(attempt, error=None):
+    response = getattr(error, "response", None)
+    retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+def complete(client, prompt, model=MODEL, max_retries=MAX_RETRIES):
+    for attempt in range(max_retries + 1):
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                raise
+            delay = backoff_delay(attempt, e)
+            print(f"⏳ Retrying in {delay:.1f}s after: {e}")
+            time.sleep(delay)
+
+def get_item_impacts(client, prompt, model=MODEL, cache=None):
+    if cache is not None:
+        cached = cache.get(prompt, model)
+        if cached is not None:
+            return cached
+    try:
+        impacts = parse_impacts(complete(client, prompt, model))
+    except Exception as e:
+        print(f"⚠️ API error: {e}")
+        return []
+    if cache is not None:
+        cache.put(prompt, model, impacts)
+    return impacts
+
+# === Main loop ===
+def analyze_articles(client, df, portfolio_items=portfolio_items, model=MODEL, cache=None, max_workers=MAX_WORKERS):
+    articles = df[["content", "date", "url"]].to_dict("records")
+    prompts = [build_item_impact_prompt(a["content"], a["date"], a["url"], portfolio_items) for a in articles]
+
+    impacts = [None] * len(articles)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(get_item_impacts, client, prompt, model, cache): i for i, prompt in enumerate(prompts)}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            impacts[futures[future]] = future.result()
+
+    return impacts_to_rows(articles, impacts)
+
+def analyze_articles_batched(client, df, portfolio_items=portfolio_items, model=MODEL, cache=None,
+                             max_workers=MAX_WORKERS, token_budget=BATCH_TOKEN_BUDGET,
+                             max_articles=MAX_ARTICLES_PER_BATCH):
+    articles = df[["content", "date", "url"]].to_dict("records")
+    header = build_batch_header(portfolio_items)
+    blocks = [build_batch_article_block(f"A{i}", a["content"], a["date"], a["url"]) for i, a in enumerate(articles)]
+    batches = pack_batches(blocks, estimate_tokens(header), token_budget, max_articles)
+    print(f"📦 Packed {len(articles)} articles into {len(batches)} requests")
+
+    # IDs restart at A0 in every batch, so a batch prompt (and its cache key)
+    # depends only on the articles inside it.
+    prompts = []
+    for batch in batches:
+        prompts.append(header + "".join(
+            build_batch_article_block(f"A{j}", articles[i]["content"], articles[i]["date"], articles[i]["url"])
+            for j, i in enumerate(batch)
+        ))
+
+    impacts = [[] for _ in articles]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(get_item_impacts, client, prompt, model, cache): b for b, prompt in enumerate(prompts)}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            batch = batches[futures[future]]
+            for item in future.result():
+                article_id = str(item.get("article_id", "")).strip()
+                j = int(article_id[1:]) if article_id[:1] == "A" and article_id[1:].isdigit() else -1
+                if 0 <= j < len(batch):
+                    impacts[batch[j]].append(item)
+                else:
+                    print(f"⚠️ Dropping impact with unknown article_id {article_id!r}")
+
+    return impacts_to_rows(articles, impacts)
+
+def impacts_to_rows(articles, impacts):
+    # Rows keep the article order regardless of completion order
+    rows = []
+    for article, article_impacts in zip(articles, impacts):
+        for item in article_impacts:
+            rows.append({
+                "date": article["date"],
+                "url": article["url"],
+                "affected_item": item.get("affected_item"),
+                "interpretation": item.get("interpretation"),
+                "impact_score": item.get("impact_score")
+            })
+    return pd.DataFrame(rows, columns=["date", "url", "affected_item", "interpretation", "impact_score"])
+
+def main(argv=None, client=None):
+    parser = argparse.ArgumentParser(description="Extract per-item impact scores from WoWHead articles with an LLM.")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--model", default=MODEL)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="concurrent API requests")
+    parser.add_argument("--cache", default=CACHE_PATH, help="SQLite response cache")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--batch-tokens", type=int, default=0,
+                        help=f"pack several articles per request up to this many prompt tokens (e.g. {BATCH_TOKEN_BUDGET}); 0 sends one article per request")
+    args = parser.parse_args(argv)
+
+    if client is None:
+        from openai import OpenAI
+        client = OpenAI()  # reads OPENAI_API_KEY
+
+    df = pd.read_excel(args.input)
+    cache = None if args.no_cache else ResponseCache(args.cache)
+    try:
+        if args.batch_tokens > 0:
+            out_df = analyze_articles_batched(client, df, portfolio_items, args.model, cache, args.workers, args.batch_tokens)
+        else:
+            out_df = analyze_articles(client, df, portfolio_items, args.model, cache, args.workers)
+    finally:
+        if cache is not None:
+            cache.close()
+
+    # === Save output ===
+    out_df.to_excel(args.output, index=False)
+    print(f"✅ Saved to {args.output}")
+    return out_df
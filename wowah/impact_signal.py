@@ -0,0 +1,97 @@
+import re
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+# === Parameters ===
+HALF_LIFE = "7D"        # an article's impact halves every 7 days
+DATE_ONLY_DELAY = "1D"  # an article dated only by day counts from the next midnight
+IMPACT_RANGE = (-10, 10)  # caps the accumulated decayed impact (one article scores -5..5)
+CLOCK_TIME = re.compile(r"\d{1,2}:\d{2}")  # a raw date string with this carries a time of day
+
+
+# === Dated impacts ===
+def load_dated_impacts(path):
+    # One row per (article, item) from wowhead_interpreted_item_impacts.xlsx
+    return dated_impacts(pd.read_excel(path))
+
+
+def dated_impacts(impact_df):
+    df = impact_df[["date", "affected_item", "impact_score"]].copy()
+    date_only = df["date"].map(is_date_only).astype(bool)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce", format="mixed")
+    df["impact_score"] = pd.to_numeric(df["impact_score"], errors="coerce")
+    df = df.dropna()
+    df = df[df["impact_score"] != 0]
+
+    # Only news that was public: day-resolution dates become available at the end of that day
+    df.loc[date_only[df.index], "date"] += pd.Timedelta(DATE_ONLY_DELAY)
+    return df.reset_index(drop=True)
+
+
+def is_date_only(value):
+    # Decided from the raw value, so a timestamped article at exactly 00:00 keeps its time:
+    # strings without a clock time and plain dates are day-resolution, datetimes are not
+    if isinstance(value, str):
+        return CLOCK_TIME.search(value) is None
+    return isinstance(value, date) and not isinstance(value, datetime)
+
+
+def _naive_ns(values):
+    # int64 ns on one clock: tz-aware values are taken in UTC, naive ones as is
+    values = pd.DatetimeIndex(values)
+    if values.tz is not None:
+        values = values.tz_convert("UTC").tz_localize(None)
+    return values.as_unit("ns").asi8
+
+
+# === Decayed impact series ===
+# score(item, t) = sum over the item's articles dated <= t of
+#                  impact_score * exp(-(t - date) / tau),   tau = half_life / ln 2
+#
+# Evaluated without a loop over rows: per item, a running log-sum-exp of
+# log|score| + date/tau (positive and negative scores kept apart) gives the
+# decayed sum at every article date; an as-of merge then picks, for each market
+# row, the item's last article at or before the row's timestamp, and the sum is
+# decayed from there. Working in the log domain keeps long histories and short
+# half-lives free of exp() overflow.
+def decayed_impact(timestamps, items, impacts, half_life=HALF_LIFE):
+    # timestamps / items: one entry per market row; impacts: dated_impacts() frame
+    # Returns one float per row (0 where the item has no public news yet)
+    tau = pd.Timedelta(half_life).value / np.log(2)
+    ts = _naive_ns(timestamps)
+    out = np.zeros(len(ts))
+    valid = ts != np.iinfo(np.int64).min  # NaT
+    if impacts.empty or not valid.any():
+        return out
+
+    events = pd.DataFrame({
+        "item": impacts["affected_item"].astype(str).to_numpy(dtype=object),
+        "date": _naive_ns(impacts["date"]),
+        "score": impacts["impact_score"].to_numpy(dtype=float),
+    })
+    origin = min(ts[valid].min(), events["date"].min())
+    events["x"] = (events["date"] - origin) / tau
+    magnitude = np.log(np.abs(events["score"].to_numpy())) + events["x"].to_numpy()
+    events["log_pos"] = np.where(events["score"] > 0, magnitude, -np.inf)
+    events["log_neg"] = np.where(events["score"] < 0, magnitude, -np.inf)
+    events.sort_values(["item", "date"], inplace=True, kind="stable")
+    for side in ("log_pos", "log_neg"):
+        events[side] = events.groupby("item", sort=False)[side].transform(
+            lambda v: np.logaddexp.accumulate(v.to_numpy())
+        )
+
+    rows = pd.DataFrame({
+        "row": np.flatnonzero(valid),
+        "item": np.asarray(items, dtype=object)[valid].astype(str),
+        "date": ts[valid],
+    }).sort_values("date", kind="stable")
+    merged = pd.merge_asof(rows, events.sort_values("date", kind="stable")[["item", "date", "log_pos", "log_neg"]],
+                           on="date", by="item", direction="backward")
+
+    x = (merged["date"].to_numpy() - origin) / tau
+    with np.errstate(invalid="ignore"):
+        score = np.exp(merged["log_pos"].to_numpy() - x) - np.exp(merged["log_neg"].to_numpy() - x)
+    out[merged["row"].to_numpy()] = np.clip(np.nan_to_num(score, nan=0.0), *IMPACT_RANGE)
+    return out
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# === Parameters ===
+ITEM_GRAPH_PATH = "item_dependencies.csv"  # columns: source, target, relation[, weight]
+RELATION_WEIGHTS = {"reagent": 0.5, "substitute": 0.25}  # default weight when a row has none
+SHOCK_WEIGHT = 10.0  # a 10% price deviation on a linked item counts like one impact-score point
+CHUNK_CELLS = 1 << 22  # items x timestamps propagated at once (~32 MB of float64)
+
+
+# === Item dependency graph ===
+# Sparse adjacency matrix A in CSR form: A[i, j] is how much of item j's signal
+# reaches item i in one hop. Edges are read as "source influences target":
+#   reagent     source is a reagent of the crafted target (reagent -> product)
+#   substitute  mirrored automatically, each item influences the other
+# Propagation is a sparse matrix product, O(edges) per timestamp; no dense
+# item x item matrix is ever built.
+class ItemGraph:
+    def __init__(self, items, indptr, indices, data):
+        self.items = list(items)
+        self.ids = {item: i for i, item in enumerate(self.items)}
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def from_edges(cls, edges, items=()):
+        # edges: DataFrame with source, target, relation and optional weight
+        edges = edges.dropna(subset=["source", "target"])
+        relation = edges["relation"] if "relation" in edges.columns else pd.Series("reagent", index=edges.index)
+        relation = relation.fillna("reagent").astype(str).str.lower()
+        unknown = set(relation) - set(RELATION_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown relation(s) {sorted(unknown)}, expected one of {sorted(RELATION_WEIGHTS)}")
+        weight = relation.map(RELATION_WEIGHTS).astype(float)
+        if "weight" in edges.columns:
+            weight = pd.to_numeric(edges["weight"], errors="coerce").fillna(weight)
+
+        source = edges["source"].astype(str).to_numpy(dtype=object)
+        target = edges["target"].astype(str).to_numpy(dtype=object)
+        mirror = (relation == "substitute").to_numpy()
+        src = np.concatenate([source, target[mirror]])
+        dst = np.concatenate([target, source[mirror]])
+        w = np.concatenate([weight.to_numpy(), weight.to_numpy()[mirror]])
+
+        names = list(dict.fromkeys([*items, *src, *dst]))
+        ids = {item: i for i, item in enumerate(names)}
+        src = np.array([ids[s] for s in src], dtype=np.int64)
+        dst = np.array([ids[d] for d in dst], dtype=np.int64)
+        keep = src != dst  # an item's own news is already its impact_score
+        return cls.from_coo(names, dst[keep], src[keep], w[keep])
+
+    @classmethod
+    def from_coo(cls, items, rows, cols, data):
+        # Duplicate (row, col) pairs are summed
+        n = len(items)
+        key = rows * n + cols
+        key, inverse = np.unique(key, return_inverse=True)
+        data = np.bincount(inverse, weights=data, minlength=len(key))
+        rows, cols = key // n, key % n
+        indptr = np.r_[0, np.cumsum(np.bincount(rows, minlength=n))]
+        return cls(items, indptr, cols, data)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    def index_of(self, items):
+        # Graph index per entry, -1 for items the graph does not know
+        return pd.Series(np.asarray(items, dtype=object)).map(self.ids).fillna(-1).astype(np.int64).to_numpy()
+
+    def propagate(self, x, hops=1):
+        # Sum of A^k x for k = 1..hops; x is (items,) or (items, T) for T timestamps at once
+        x = np.asarray(x, dtype=float)
+        total = np.zeros_like(x)
+        for _ in range(hops):
+            x = self._matmul(x)
+            total += x
+        return total
+
+    def _matmul(self, x):
+        out = np.zeros_like(x)
+        if not self.nnz:
+            return out
+        gathered = x[self.indices] * (self.data if x.ndim == 1 else self.data[:, None])
+        nonempty = np.flatnonzero(np.diff(self.indptr))
+        out[nonempty] = np.add.reduceat(gathered, self.indptr[nonempty], axis=0)
+        return out
+
+    def linked_scores(self, timestamps, items, impact, deviation=None, shock_weight=SHOCK_WEIGHT, hops=1):
+        # Per market row: the impact and price shocks of the item's neighbours at
+        # the same timestamp, propagated through the graph. Rows are scattered
+        # into an items x timestamps block, a chunk of timestamps at a time.
+        signal = np.nan_to_num(np.asarray(impact, dtype=float))
+        if deviation is not None and shock_weight:
+            deviation = np.asarray(deviation, dtype=float)
+            signal = signal + shock_weight * np.nan_to_num(deviation, nan=0.0, posinf=0.0, neginf=0.0)
+        t_codes, _ = pd.factorize(pd.DatetimeIndex(timestamps), sort=True)  # NaT -> -1
+        i_codes = self.index_of(items)
+        out = np.zeros(len(signal))
+
+        rows = np.flatnonzero((t_codes >= 0) & (i_codes >= 0))
+        if not len(rows) or not self.nnz:
+            return out
+        rows = rows[np.argsort(t_codes[rows], kind="stable")]
+        t_sorted = t_codes[rows]
+        # Never wider than the data: a small graph would otherwise allocate CHUNK_CELLS every call
+        step = min(max(1, CHUNK_CELLS // len(self)), int(t_sorted[-1]) + 1)
+        for start in range(0, t_sorted[-1] + 1, step):
+            lo, hi = np.searchsorted(t_sorted, [start, start + step])
+            if lo == hi:
+                continue
+            chunk = rows[lo:hi]
+            block = np.zeros((len(self), step))
+            block[i_codes[chunk], t_codes[chunk] - start] = signal[chunk]
+            out[chunk] = self.propagate(block, hops)[i_codes[chunk], t_codes[chunk] - start]
+        return out
+
+
+def load_item_graph(path=ITEM_GRAPH_PATH, items=()):
+    return ItemGraph.from_edges(pd.read_csv(path), items)
@@ -0,0 +1,161 @@
+from array import array
+
+import numpy as np
+import pandas as pd
+
+# === Trade log codes ===
+ACTIONS = ("BUY", "SELL")
+BUY, SELL = 0, 1
+TRADE_LOG_COLUMNS = ["timestamp", "item", "action", "price", "qty", "gold", "reason"]
+INITIAL_CAPACITY = 1024
+
+
+# === Inventory ===
+# Items get an integer ID on first touch; quantity and cost basis live in two
+# flat arrays indexed by that ID instead of one dict per item. Reading
+# inventory[item] still returns a {"qty", "avg_cost"} dict for callers of the
+# old defaultdict.
+class Inventory:
+    __slots__ = ("names", "ids", "qty", "avg_cost")
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.qty = array("q")
+        self.avg_cost = array("d")
+
+    def id_of(self, item):
+        i = self.ids.get(item)
+        if i is None:
+            i = self.ids[item] = len(self.names)
+            self.names.append(item)
+            self.qty.append(0)
+            self.avg_cost.append(0.0)
+        return i
+
+    def __getitem__(self, item):
+        i = self.ids.get(item)
+        if i is None:
+            return {"qty": 0, "avg_cost": 0}
+        return {"qty": self.qty[i], "avg_cost": self.avg_cost[i]}
+
+    def get(self, item, default=None):
+        return self[item] if item in self.ids else default
+
+    def __contains__(self, item):
+        return item in self.ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def items(self):
+        for i, name in enumerate(self.names):
+            yield name, {"qty": self.qty[i], "avg_cost": self.avg_cost[i]}
+
+    def value(self, current_prices, total=0):
+        # Summed onto `total` in first-touch order, like iterating the old dict
+        qty, avg_cost = self.qty, self.avg_cost
+        for i, name in enumerate(self.names):
+            if qty[i] > 0:
+                total += qty[i] * current_prices.get(name, avg_cost[i])
+        return total
+
+
+# === Columnar trade log ===
+# One preallocated array per column, doubled when full. Items, actions and
+# reasons are stored as small integer codes (reasons are interned on first use),
+# so a trade costs a few array writes instead of a 7-key dict. With
+# enabled=False nothing is stored and only the trade count is kept.
+class TradeLog:
+    __slots__ = ("enabled", "count", "tz", "items", "reasons", "_item_ids", "_reason_ids", "_columns")
+
+    def __init__(self, enabled=True, capacity=INITIAL_CAPACITY):
+        self.enabled = enabled
+        self.count = 0
+        self.tz = None
+        self.items, self._item_ids = [], {}
+        self.reasons, self._reason_ids = [], {}
+        capacity = capacity if enabled else 0
+        self._columns = {
+            "timestamp": np.empty(capacity, dtype=np.int64),
+            "item": np.empty(capacity, dtype=np.int32),
+            "action": np.empty(capacity, dtype=np.int8),
+            "price": np.empty(capacity, dtype=float),
+            "qty": np.empty(capacity, dtype=np.int64),
+            "gold": np.empty(capacity, dtype=float),
+            "reason": np.empty(capacity, dtype=np.int16),
+        }
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def _intern(value, table, ids):
+        code = ids.get(value)
+        if code is None:
+            code = ids[value] = len(table)
+            table.append(value)
+        return code
+
+    def _grow(self):
+        size = max(2 * len(self._columns["price"]), INITIAL_CAPACITY)
+        for name, col in self._columns.items():
+            grown = np.empty(size, dtype=col.dtype)
+            grown[:self.count] = col[:self.count]
+            self._columns[name] = grown
+
+    def append(self, timestamp, item, action, price, qty, gold, reason):
+        if not self.enabled:
+            self.count += 1
+            return
+        if self.count == len(self._columns["price"]):
+            self._grow()
+        if self.count == 0:
+            self.tz = timestamp.tz
+        i, c = self.count, self._columns
+        c["timestamp"][i] = timestamp.value  # ns since epoch (UTC when tz-aware)
+        c["item"][i] = self._intern(item, self.items, self._item_ids)
+        c["action"][i] = action
+        c["price"][i] = price
+        c["qty"][i] = qty
+        c["gold"][i] = gold
+        c["reason"][i] = self._intern(reason, self.reasons, self._reason_ids)
+        self.count += 1
+
+    def row(self, i):
+        c = self._columns
+        i = range(self.count)[i]
+        timestamp = pd.Timestamp(int(c["timestamp"][i]), unit="ns")
+        if self.tz is not None:
+            timestamp = timestamp.tz_localize("UTC").tz_convert(self.tz)
+        return {
+            "timestamp": timestamp,
+            "item": self.items[c["item"][i]],
+            "action": ACTIONS[c["action"][i]],
+            "price": float(c["price"][i]),
+            "qty": int(c["qty"][i]),
+            "gold": float(c["gold"][i]),
+            "reason": self.reasons[c["reason"][i]],
+        }
+
+    def to_frame(self):
+        # Numeric columns are views of the buffers, not copies; the coded columns
+        # become categoricals and only their small code arrays are copied.
+        if not self.enabled:
+            return pd.DataFrame(columns=TRADE_LOG_COLUMNS)
+        n, c = self.count, self._columns
+        timestamp = pd.Series(c["timestamp"][:n].view("datetime64[ns]"), copy=False)
+        if self.tz is not None:
+            timestamp = timestamp.dt.tz_localize("UTC").dt.tz_convert(self.tz)
+        return pd.DataFrame({
+            "timestamp": timestamp,
+            "item": pd.Categorical.from_codes(c["item"][:n], categories=self.items, validate=False),
+            "action": pd.Categorical.from_codes(c["action"][:n], categories=list(ACTIONS), validate=False),
+            "price": c["price"][:n],
+            "qty": c["qty"][:n],
+            "gold": c["gold"][:n],
+            "reason": pd.Categorical.from_codes(c["reason"][:n], categories=self.reasons, validate=False),
+        }, copy=False)
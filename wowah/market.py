@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from wowah.features import prepare_market_data
+from wowah.params import DEFAULT_PARAMS
+
+ARRAY_COLUMNS = ("market_value", "min_buyout", "quantity", "hour", "dow", "weekly_reset", "ma", "deviation")
+
+
+# === Shared pre-featurized market data ===
+# Built once from the raw frame: rows sorted by timestamp then item, the derived
+# hour/dow/reset/MA/deviation columns, and integer item codes, all held as
+# read-only arrays. Traders reference one instance without copying it; per-run
+# quantity noise is passed to them as a separate overlay array.
+class MarketData:
+    def __init__(self, timestamps, item_codes, items, columns, ma_window):
+        self.timestamps = timestamps  # DatetimeIndex, immutable
+        self.item_codes = item_codes
+        self.items = items
+        self.ma_window = ma_window
+        for name in ARRAY_COLUMNS:
+            setattr(self, name, columns.get(name))
+        self._freeze()
+
+    @classmethod
+    def from_frame(cls, data, ma_window=DEFAULT_PARAMS["ma_window"]):
+        return cls.from_prepared(prepare_market_data(data, ma_window), ma_window)
+
+    @classmethod
+    def from_prepared(cls, df, ma_window=DEFAULT_PARAMS["ma_window"]):
+        # Wraps a prepare_market_data frame as is: no re-parsing or re-sorting
+        codes, items = pd.factorize(df["item_name"])
+        sources = {name: f"ma{ma_window}" if name == "ma" else name for name in ARRAY_COLUMNS}
+        columns = {name: df[source].to_numpy() for name, source in sources.items() if source in df.columns}
+        return cls(pd.DatetimeIndex(df["timestamp"]), codes.astype(np.int32), list(items), columns, ma_window)
+
+    def _freeze(self):
+        for name in ("item_codes",) + ARRAY_COLUMNS:
+            values = getattr(self, name)
+            if values is not None:
+                values.flags.writeable = False
+
+    def __setstate__(self, state):
+        # Arrays come back writeable from a pickle (e.g. in worker processes)
+        self.__dict__.update(state)
+        self._freeze()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def check_overlay(self, quantity):
+        if quantity is not None and len(quantity) != len(self):
+            raise ValueError(f"quantity overlay has {len(quantity)} rows, market data has {len(self)}")
+        return quantity
+
+    def frame(self, quantity=None):
+        # DataFrame view over the shared arrays for the row-loop engines
+        columns = {
+            "timestamp": self.timestamps,
+            "item_name": pd.Categorical.from_codes(self.item_codes, categories=self.items, validate=False),
+        }
+        for name in ARRAY_COLUMNS:
+            values = self.check_overlay(quantity) if name == "quantity" and quantity is not None else getattr(self, name)
+            if values is not None:
+                columns[f"ma{self.ma_window}" if name == "ma" else name] = values
+        return pd.DataFrame(columns, copy=False)
@@ -0,0 +1,103 @@
+import math
+from bisect import bisect_right
+
+import numpy as np
+
+# === Depth model parameters ===
+LEVELS = 20                # price levels per side of the book
+MIN_ASK_SPREAD = 0.05      # ask ladder spans at least 5% above min_buyout
+BID_SPREAD = 0.10          # bids run from market_value down to 10% below it
+BID_DEPTH_FRACTION = 0.02  # bids absorb at most 2% of the listed quantity per snapshot
+
+
+# === Execution layer ===
+# The traders decide *whether* and *how much* to trade; a fill model decides
+# how much of that actually executes and at what cost. Both return
+# (filled_qty, total_gold, avg_price).
+
+class FlatFill:
+    # The original approximation: buys at market_value up to the listed quantity,
+    # sells at market_value for the full requested quantity.
+    def buy(self, price, min_buyout, quantity, budget):
+        # Whole units: a float quantity column (e.g. one with gaps) must not leak into the inventory
+        qty = int(min(quantity, budget // price)) if quantity > 0 else 0
+        return qty, qty * price, price
+
+    def sell(self, price, quantity, qty):
+        return qty, qty * price, price
+
+
+class DepthFill:
+    # Each snapshot row gets a synthetic book built from its three columns:
+    #   asks: `levels` equal slices of the listed quantity, priced linearly from
+    #         min_buyout up to 2 * market_value - min_buyout, so the whole book's
+    #         VWAP is market_value and small buys fill near min_buyout;
+    #   bids: bid_depth_fraction of the listed quantity, priced linearly from
+    #         market_value down by bid_spread.
+    # Every row's ladder is an affine map of one normalized ladder, so the
+    # cumulative quantity (F) and cumulative price-offset (G) arrays are built once
+    # and each fill is a binary search over them: O(log levels) per fill.
+    def __init__(self, levels=LEVELS, min_ask_spread=MIN_ASK_SPREAD, bid_spread=BID_SPREAD,
+                 bid_depth_fraction=BID_DEPTH_FRACTION):
+        if levels < 2:
+            raise ValueError("A depth ladder needs at least 2 levels")
+        self.levels = levels
+        self.min_ask_spread = min_ask_spread
+        self.bid_spread = bid_spread
+        self.bid_depth_fraction = bid_depth_fraction
+        offsets = np.arange(levels) / (levels - 1)     # level price position in [0, 1]
+        self._offsets = offsets.tolist()
+        self._F = (np.arange(1, levels + 1) / levels).tolist()   # cumulative quantity share
+        self._G = (np.cumsum(offsets) / levels).tolist()         # cumulative offset share
+
+    # --- ladder arithmetic: level j trades total/levels units at base + span * offsets[j] ---
+    def _cost(self, qty, total, base, span):
+        # Gold for the first qty units of the ladder (qty <= total)
+        k = min(bisect_right(self._F, qty / total), self.levels - 1)
+        filled = total * self._F[k - 1] if k else 0.0
+        cost = total * (base * self._F[k - 1] + span * self._G[k - 1]) if k else 0.0
+        return cost + (qty - filled) * (base + span * self._offsets[k])
+
+    def _max_qty(self, budget, total, base, span):
+        # Largest real quantity whose cost fits the budget: binary search for the
+        # first level the budget cannot clear, then a partial fill inside it
+        lo, hi = 0, self.levels
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if total * (base * self._F[mid] + span * self._G[mid]) <= budget:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.levels:
+            return total
+        spent = total * (base * self._F[lo - 1] + span * self._G[lo - 1]) if lo else 0.0
+        filled = total * self._F[lo - 1] if lo else 0.0
+        return filled + (budget - spent) / (base + span * self._offsets[lo])
+
+    def _ask_ladder(self, price, min_buyout):
+        base = min_buyout if min_buyout is not None and min_buyout > 0 and not math.isnan(min_buyout) else price
+        top = max(2 * price - base, base * (1 + self.min_ask_spread))
+        return base, top - base
+
+    # --- fills ---
+    def buy(self, price, min_buyout, quantity, budget):
+        if not quantity > 0 or not price > 0 or not budget > 0:
+            return 0, 0.0, price
+        base, span = self._ask_ladder(price, min_buyout)
+        qty = min(int(quantity), int(self._max_qty(budget, quantity, base, span)))
+        cost = self._cost(qty, quantity, base, span) if qty > 0 else 0.0
+        while qty > 0 and cost > budget:  # float rounding at the budget edge
+            qty -= 1
+            cost = self._cost(qty, quantity, base, span) if qty > 0 else 0.0
+        return qty, cost, cost / qty if qty else price
+
+    def sell(self, price, quantity, qty):
+        depth = self.bid_depth_fraction * quantity if quantity > 0 else 0.0
+        qty = min(qty, int(depth))
+        if qty <= 0 or not price > 0:
+            return 0, 0.0, price
+        proceeds = self._cost(qty, depth, price, -price * self.bid_spread)
+        return qty, proceeds, proceeds / qty
+
+
+FILL_MODELS = {"flat": FlatFill, "depth": DepthFill}
@@ -0,0 +1,25 @@
+# === Strategy parameters shared by both traders ===
+# Defaults reproduce the original hard-coded rules.
+DEFAULT_PARAMS = {
+    "ma_window": 7,                 # rolling MA length in snapshots
+    "buy_threshold": -0.10,         # BUY when deviation from MA is below this
+    "sell_threshold": 0.10,         # SELL when deviation from MA is above this
+    "buy_budget_fraction": 0.10,    # share of gold spent per BUY
+    "max_sell_fraction": 0.01,      # share of server quantity sold per SELL
+    "buy_hours": (3, 4, 5, 6),      # low-activity hours eligible for BUY
+    "sell_hours": (15, 16, 17),     # post-reset hours forcing a SELL...
+    "sell_days": (2, 3),            # ...on these days of week (Wed/Thu)
+}
+
+
+def resolve_params(params=None):
+    resolved = dict(DEFAULT_PARAMS)
+    if params:
+        unknown = set(params) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown strategy parameters: {sorted(unknown)}")
+        resolved.update(params)
+    for key in ("buy_hours", "sell_hours", "sell_days"):
+        resolved[key] = tuple(int(v) for v in resolved[key])
+    resolved["ma_window"] = int(resolved["ma_window"])
+    return resolved
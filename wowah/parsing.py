@@ -0,0 +1,58 @@
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pandas as pd
+
+
+# === AH monthly JSON (AH_Scraper.py) ===
+def decode_monthly_response(body):
+    # Decompress response (HTTP clients may already have undone the gzip)
+    if body[:2] == b"\x1f\x8b":
+        compressed = io.BytesIO(body)
+        with gzip.GzipFile(fileobj=compressed) as f:
+            raw_data = f.read().decode('utf-8')
+    else:
+        raw_data = body.decode('utf-8')
+
+    json_data = json.loads(raw_data)
+
+    # Parse item name and auction data
+    item_name = json_data["item"]["itemName"]
+    df = pd.DataFrame(json_data["auctions"])
+    df["timestamp"] = pd.to_datetime(df["dateTime"])
+    df.rename(columns={"price": "market_value", "minBuyout": "min_buyout"}, inplace=True)
+    df.drop(columns=["dateTime"], inplace=True)
+    df["item_name"] = item_name
+    return df
+
+
+# === WoWHead article dates (WoWHead_Scraper.py) ===
+def normalize_date(date_str):
+    now = datetime.now()
+    try:
+        date_str = date_str.lower().replace("posted", "").strip()
+
+        if "min ago" in date_str or "hr" in date_str or "day" in date_str:
+            time_ago = date_str.replace("ago", "").strip()
+            tokens = time_ago.split()
+            delta = {}
+            i = 0
+            while i < len(tokens):
+                if tokens[i] in ["hr", "hrs", "hour", "hours"]:
+                    delta["hours"] = int(tokens[i - 1])
+                elif tokens[i] in ["min", "mins", "minute", "minutes"]:
+                    delta["minutes"] = int(tokens[i - 1])
+                elif tokens[i] in ["day", "days"]:
+                    delta["days"] = int(tokens[i - 1])
+                i += 1
+            offset = pd.Timedelta(**delta)
+            return (now - offset).strftime("%Y-%m-%d")
+        else:
+            dt = pd.to_datetime(date_str, errors='coerce')
+            if pd.isna(dt):
+                return None
+            return dt.strftime("%Y-%m-%d")
+    except Exception:
+        return None
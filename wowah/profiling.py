@@ -0,0 +1,135 @@
+import json
+import os
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+# === Parameters ===
+PROFILE_ENV = "WOWAH_PROFILE"  # "1" for timers and counters, "memory" to add tracemalloc peaks
+PROFILE_PATH = "profile_report.json"
+
+_OFF = nullcontext()  # shared: a disabled phase() allocates nothing
+
+
+# === Phase timers and counters ===
+# A disabled profiler hands out one shared no-op context and returns iterables
+# untouched, so instrumented code pays an attribute lookup per phase, not per row.
+# Counters are added in bulk (once per phase or run), never inside row loops.
+class Profiler:
+    def __init__(self, enabled=False, memory=False):
+        self.enabled = enabled
+        self.memory = enabled and memory
+        self.phases = {}
+        self.counters = {}
+        self._peaks = []  # running peak of each open phase, innermost last
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_env(cls):
+        value = os.environ.get(PROFILE_ENV, "").strip().lower()
+        return cls(enabled=value not in ("", "0", "false", "no"), memory=value == "memory")
+
+    def phase(self, name):
+        return _Phase(self, name) if self.enabled else _OFF
+
+    def iterate(self, name, iterable):
+        # Charges the time spent producing each item (e.g. a groupby) to `name`
+        if not self.enabled:
+            return iterable
+        return self._timed_iter(name, iter(iterable))
+
+    def _timed_iter(self, name, iterator):
+        while True:
+            with self.phase(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + int(n)
+
+    def _record(self, name, wall, cpu, peak):
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases[name] = {"wall_s": 0.0, "cpu_s": 0.0, "calls": 0}
+        stats["wall_s"] += wall
+        stats["cpu_s"] += cpu
+        stats["calls"] += 1
+        if peak is not None:
+            stats["peak_bytes"] = max(stats.get("peak_bytes", 0), peak)
+
+    def report(self):
+        report = {"phases": {name: dict(stats) for name, stats in self.phases.items()}, "counters": dict(self.counters)}
+        if self.memory:
+            report["peak_bytes"] = max((s.get("peak_bytes", 0) for s in self.phases.values()), default=0)
+        return report
+
+    def write(self, path=PROFILE_PATH):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "wall", "cpu")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        peaks = self.profiler._peaks
+        if self.profiler.memory:
+            # tracemalloc keeps one global peak: fold it into the enclosing phase,
+            # then reset it so this phase starts from the current usage
+            if peaks:
+                peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+            peaks.append(0)
+            tracemalloc.reset_peak()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        peak = None
+        peaks = self.profiler._peaks
+        if self.profiler.memory:
+            peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak)
+        self.profiler._record(self.name, wall, cpu, peak)
+        return False
+
+
+# === Aggregation across runs ===
+def aggregate_reports(reports):
+    # Per phase and counter: total, mean, min and max over the runs
+    reports = [r for r in reports if r]
+    summary = {"runs": len(reports), "phases": {}, "counters": {}}
+    names = sorted({name for r in reports for name in r["phases"]})
+    for name in names:
+        stats = [r["phases"][name] for r in reports if name in r["phases"]]
+        summary["phases"][name] = {
+            key: _describe([s[key] for s in stats]) for key in ("wall_s", "cpu_s", "calls")
+        }
+        peaks = [s["peak_bytes"] for s in stats if "peak_bytes" in s]
+        if peaks:
+            summary["phases"][name]["peak_bytes"] = max(peaks)
+    for name in sorted({name for r in reports for name in r["counters"]}):
+        summary["counters"][name] = _describe([r["counters"].get(name, 0) for r in reports])
+    peaks = [r["peak_bytes"] for r in reports if "peak_bytes" in r]
+    if peaks:
+        summary["peak_bytes"] = max(peaks)
+    return summary
+
+
+def _describe(values):
+    total = sum(values)
+    return {"total": total, "mean": total / len(values), "min": min(values), "max": max(values)}
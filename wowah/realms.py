@@ -0,0 +1,125 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from wowah.simulator import ENGINES, STARTING_GOLD, WoWAHTraderReinvesting as VanillaTrader
+from wowah.simulator_insights import INSIGHT_PATH, WoWAHTraderReinvesting as InsightfulTrader
+from wowah.simulator_insights import load_impact_scores
+from wowah.store import list_markets, load_market_data, parse_market
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+MODELS = ("vanilla", "insights")
+REPORT_PATH = "realm_report.csv"
+TOTAL_LABEL = "ALL"  # region/realm of the consolidated row
+REPORT_COLUMNS = ["region", "realm", "items", "rows", "trades", "final_gold", "holdings_value", "total_value",
+                  "return_pct"]
+
+
+# -----------------------------
+# ONE REALM PER TASK
+# -----------------------------
+# Filled once per worker by init_worker. A worker loads, simulates and drops one
+# realm's shard at a time and hands back only a summary row, so memory is bounded
+# by the largest shard times the number of workers, not by the whole dataset.
+_worker = {}
+
+def init_worker(path, model, impact_scores, engine, out_dir):
+    _worker["path"] = path
+    _worker["model"] = model
+    _worker["impact_scores"] = impact_scores
+    _worker["engine"] = engine
+    _worker["out_dir"] = out_dir
+
+def run_realm(region, realm):
+    df = load_market_data(_worker["path"], region=region, realm=realm)
+    log_trades = _worker["out_dir"] is not None
+    if _worker["model"] == "insights":
+        bot = InsightfulTrader(df, _worker["impact_scores"], log_trades=log_trades)
+    else:
+        bot = VanillaTrader(df, engine=_worker["engine"], log_trades=log_trades)
+    bot.simulate()
+
+    if log_trades:
+        log = bot.results()
+        log.insert(0, "realm", realm)
+        log.insert(0, "region", region)
+        log.to_csv(os.path.join(_worker["out_dir"], f"trades_{region}_{realm}.csv"), index=False)
+
+    # portfolio_value() already includes gold; holdings are the remainder
+    last_prices = df.groupby("item_name", observed=True)["market_value"].last().to_dict()
+    total_value = bot.portfolio_value(last_prices)
+    return {
+        "region": region,
+        "realm": realm,
+        "items": len(last_prices),
+        "rows": len(df),
+        "trades": len(bot.trade_log),
+        "final_gold": bot.gold,
+        "holdings_value": total_value - bot.gold,
+        "total_value": total_value,
+        "return_pct": 100 * (total_value / STARTING_GOLD - 1),
+    }
+
+
+# -----------------------------
+# SHARDED RUN
+# -----------------------------
+def run_sharded(path=None, markets=None, model="vanilla", impact_scores=None, engine="numpy", workers=None,
+                out_dir=None):
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}, expected one of {MODELS}")
+    markets = list(markets or list_markets(path))
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    initargs = (path, model, impact_scores or {}, engine, out_dir)
+
+    # chunksize=1: realms are handed out one at a time as workers free up
+    workers = min(workers or os.cpu_count(), len(markets))
+    if workers <= 1:
+        init_worker(*initargs)
+        rows = [run_realm(region, realm) for region, realm in markets]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+            rows = list(executor.map(run_realm, *zip(*markets), chunksize=1))
+    return consolidate(rows)
+
+def consolidate(rows):
+    # Per-realm rows plus one total: every realm starts from its own STARTING_GOLD
+    if not rows:
+        return pd.DataFrame(columns=REPORT_COLUMNS)
+    report = pd.DataFrame(rows, columns=REPORT_COLUMNS).sort_values(["region", "realm"], ignore_index=True)
+    total = report[["items", "rows", "trades", "final_gold", "holdings_value", "total_value"]].sum()
+    total["region"] = total["realm"] = TOTAL_LABEL
+    total["return_pct"] = 100 * (total["total_value"] / (STARTING_GOLD * len(report)) - 1)
+    return pd.concat([report, total.to_frame().T], ignore_index=True).astype(report.dtypes.to_dict())
+
+
+# -----------------------------
+# RUN
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the trader on every realm, one shard per process.")
+    parser.add_argument("--data", help="price store directory or CSV (default: ah_store/ if present, else the CSV)")
+    parser.add_argument("--realms", nargs="+", metavar="REGION/REALM", help="realms to run (default: all in --data)")
+    parser.add_argument("--model", choices=MODELS, default="vanilla")
+    parser.add_argument("--impacts", default=INSIGHT_PATH, help="impact scores for --model insights")
+    parser.add_argument("--engine", choices=ENGINES, default="numpy", help="vanilla trader engine")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="realms simulated at once")
+    parser.add_argument("--trades-dir", help="also write each realm's trade log to this directory")
+    parser.add_argument("--out", default=REPORT_PATH)
+    args = parser.parse_args(argv)
+
+    markets = [parse_market(m) for m in args.realms] if args.realms else list_markets(args.data)
+    impact_scores = load_impact_scores(args.impacts) if args.model == "insights" else None
+
+    print(f"⏳ Simulating {len(markets)} realms on {min(args.workers or 1, len(markets))} workers...")
+    report = run_sharded(args.data, markets, args.model, impact_scores, args.engine, args.workers, args.trades_dir)
+    report.to_csv(args.out, index=False)
+
+    print(report.to_string(index=False))
+    print(f"\n✅ Saved the per-realm report to {args.out}")
+    return report
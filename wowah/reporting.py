@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# === Parameters ===
+FORMATS = ("csv",)  # Excel is opt-in: formats=("csv", "xlsx")
+WIDTH_SAMPLE = 1000  # rows read per column to size the Excel columns
+PLOT_WORKERS = os.cpu_count()
+MIN_PLOTS_PER_WORKER = 4  # below this a process pool costs more than it saves
+
+
+# === Trade log export ===
+def export_trade_log(log, csv_path="reinvesting_trade_log.csv", xlsx_path="reinvesting_trade_log.xlsx",
+                     formats=FORMATS):
+    if "csv" in formats:
+        log.to_csv(csv_path, index=False)
+
+    if "xlsx" in formats:
+        with pd.ExcelWriter(xlsx_path, engine='xlsxwriter') as writer:
+            log.to_excel(writer, index=False, sheet_name='Trade Log')
+            worksheet = writer.sheets['Trade Log']
+            for i, col in enumerate(log.columns):
+                worksheet.set_column(i, i, column_width(log[col]) + 2)
+
+
+def column_width(values, sample=WIDTH_SAMPLE):
+    # Longest rendered value, estimated: categoricals (item, action, reason) from
+    # their categories, other columns from `sample` evenly spaced rows
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        rendered = values.cat.categories.astype(str)
+    else:
+        if len(values) > sample:
+            values = values.iloc[np.linspace(0, len(values) - 1, sample).astype(int)]
+        rendered = values.astype(str)
+    longest = rendered.str.len().max() if len(rendered) else 0
+    return max(int(longest), len(str(values.name)))
+
+
+# === Holdings plots ===
+def holdings_positions(log):
+    # Running quantity held per item after each trade, in log order
+    signed = np.where(log["action"] == "BUY", log["qty"], -log["qty"])
+    return pd.Series(signed, index=log.index).groupby(log["item"], observed=True, sort=False).cumsum()
+
+
+def init_plot_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+
+
+def plot_item(item, timestamps, position, path):
+    # Figure API instead of pyplot: no global figure state, safe in any process
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 4))
+    ax = fig.add_subplot()
+    ax.plot(timestamps, position, drawstyle="steps-post")
+    ax.set_title(f"Holdings Over Time: {item}")
+    ax.set_xlabel("Timestamp")
+    ax.set_ylabel("Quantity Held")
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def plot_holdings(log, out_dir="plots", workers=PLOT_WORKERS):
+    os.makedirs(out_dir, exist_ok=True)
+    log = log.assign(timestamp=pd.to_datetime(log["timestamp"]), position=holdings_positions(log))
+    tasks = [
+        (item, group["timestamp"], group["position"], os.path.join(out_dir, f"holdings_{str(item).replace(' ', '_')}.png"))
+        for item, group in log.groupby("item", observed=True, sort=False)
+    ]
+
+    # One figure per item, rendered on the Agg backend in a process pool
+    workers = min(workers or 1, len(tasks) // MIN_PLOTS_PER_WORKER)
+    if workers <= 1:
+        return [plot_item(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_plot_worker) as executor:
+        return list(executor.map(plot_item, *zip(*tasks)))
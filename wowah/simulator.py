@@ -0,0 +1,279 @@
+import argparse
+import os
+
+import numpy as np
+
+from wowah.features import prepare_market_data
+from wowah.ledger import BUY, SELL, Inventory, TradeLog
+from wowah.market import MarketData
+from wowah.orderbook import FILL_MODELS, FlatFill
+from wowah.params import resolve_params
+from wowah.profiling import PROFILE_PATH, Profiler
+from wowah.store import load_market_data, parse_market
+
+STARTING_GOLD = 100000
+
+ENGINES = ("loop", "numpy")
+SELL_REASON = "MA spike or post-reset"
+BUY_REASON = "MA dip + low hour"
+
+
+def signal_masks(market, params):
+    # Rows where the SELL / BUY entry rules fire, before inventory and budget checks
+    p = params
+    valid = ~market.timestamps.isna()  # groupby drops NaT keys
+    deviation = market.deviation.astype(float, copy=False)
+    hour, dow = market.hour, market.dow
+    sell = valid & ((deviation > p["sell_threshold"]) | (np.isin(dow, p["sell_days"]) & np.isin(hour, p["sell_hours"])))
+    buy = valid & (deviation < p["buy_threshold"]) & (np.isin(hour, p["buy_hours"]) | (market.weekly_reset != 0))
+    return sell, buy
+
+class WoWAHTraderReinvesting:
+    def __init__(self, data, engine="loop", prepared=False, params=None, log_trades=True, quantity=None,
+                 fill_model=None, profiler=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        if isinstance(data, MarketData):
+            # Shared, read-only and already featurized: referenced, never copied
+            self.market, self.data = data, None
+            self.quantity = data.check_overlay(quantity)  # per-run quantity noise, if any
+        elif quantity is not None:
+            raise ValueError("A quantity overlay needs MarketData input")
+        else:
+            self.market, self.data, self.quantity = None, data.copy(), None
+        self.engine = engine
+        self.prepared = prepared  # data already carries the prepare_data() features
+        self.params = resolve_params(params)
+        self.fill = fill_model if fill_model is not None else FlatFill()  # execution layer, see wowah/orderbook.py
+        self.gold = STARTING_GOLD
+        self.inventory = Inventory()
+        self.trade_log = TradeLog(enabled=log_trades)  # log_trades=False keeps only the trade count
+        self.profiler = profiler if profiler is not None else Profiler.from_env()  # off unless WOWAH_PROFILE is set
+
+    def prepare_data(self):
+        if self.prepared or self.market is not None:
+            return
+        self.data = prepare_market_data(self.data, self.params["ma_window"])
+
+    def _frame(self):
+        return self.data if self.market is None else self.market.frame(self.quantity)
+
+    def simulate(self):
+        prof = self.profiler
+        with prof.phase("prepare_data"):
+            self.prepare_data()
+        with prof.phase("simulate"):
+            if self.engine == "numpy":
+                self._simulate_numpy()
+            else:
+                self._simulate_loop()
+        if prof.enabled:
+            self._count_signals()
+
+    def _count_signals(self):
+        # Bulk counters for the profiler, computed after the run instead of per row
+        market = self.market if self.market is not None else MarketData.from_prepared(self.data, self.params["ma_window"])
+        sell, buy = signal_masks(market, self.params)
+        prof = self.profiler
+        prof.count("rows", len(market))
+        prof.count("sell_signals", sell.sum())
+        prof.count("buy_signals", buy.sum())
+        prof.count("trades", self.trade_log.count)
+
+    def _simulate_loop(self):
+        frame = self._frame()
+        prof = self.profiler
+        prof.count("rows_visited", 2 * len(frame))  # one SELL and one BUY pass over every row
+        has_min_buyout = "min_buyout" in frame.columns
+        for timestamp, group in prof.iterate("groupby", frame.groupby("timestamp")):
+            # SELL first
+            with prof.phase("sell"):
+                for _, row in group.iterrows():
+                    self._sell_row(timestamp, row["item_name"], row["market_value"], row["deviation"],
+                                   row["hour"], row["dow"], row["quantity"])
+
+            # BUY next
+            with prof.phase("buy"):
+                for _, row in group.iterrows():
+                    self._buy_row(timestamp, row["item_name"], row["market_value"], row["deviation"],
+                                  row["hour"], row["weekly_reset"], row["quantity"],
+                                  row["min_buyout"] if has_min_buyout else None)
+
+    # --- per-row rules, shared by the loop engine and the streaming trader ---
+    def _sell_row(self, timestamp, item, price, deviation, hour, dow, server_qty):
+        p = self.params
+        if deviation > p["sell_threshold"] or (dow in p["sell_days"] and hour in p["sell_hours"]):
+            inv = self.inventory
+            i = inv.id_of(item)
+            held = inv.qty[i]
+            if held > 0:
+                max_sell_qty = int(p["max_sell_fraction"] * server_qty)
+                sell_qty = min(held, max_sell_qty)
+                if sell_qty <= 0:
+                    return False
+                sell_qty, revenue, fill_price = self.fill.sell(price, server_qty, sell_qty)
+                if sell_qty <= 0:
+                    return False
+                inv.qty[i] = held - sell_qty
+                if inv.qty[i] == 0:
+                    inv.avg_cost[i] = 0
+                self.gold += revenue
+                self.trade_log.append(timestamp, item, SELL, fill_price, sell_qty, self.gold, SELL_REASON)
+                return True
+        return False
+
+    def _buy_row(self, timestamp, item, price, deviation, hour, reset, qty_available, min_buyout=None):
+        p = self.params
+        if deviation < p["buy_threshold"] and (hour in p["buy_hours"] or reset):
+            budget = p["buy_budget_fraction"] * self.gold
+            qty, cost, fill_price = self.fill.buy(price, min_buyout, qty_available, budget)
+            if qty <= 0:
+                return False
+
+            inv = self.inventory
+            i = inv.id_of(item)
+            held = inv.qty[i]
+            new_qty = held + qty
+            inv.avg_cost[i] = (inv.avg_cost[i] * held + cost) / new_qty
+            inv.qty[i] = new_qty
+            self.gold -= cost
+            self.trade_log.append(timestamp, item, BUY, fill_price, qty, self.gold, BUY_REASON)
+            return True
+        return False
+
+    def _simulate_numpy(self):
+        # Same rules as _simulate_loop, but the entry conditions are evaluated
+        # column-wise up front so Python only visits rows that can trade.
+        market = self.market if self.market is not None else MarketData.from_prepared(self.data, self.params["ma_window"])
+        p = self.params
+        prof = self.profiler
+        ts = market.timestamps.asi8
+        price = market.market_value
+        quantity = market.quantity if self.quantity is None else self.quantity
+        codes, items = market.item_codes, market.items
+
+        with prof.phase("candidates"):
+            # Timestamp group boundaries as offsets into the sorted arrays
+            starts = np.flatnonzero(np.r_[True, ts[1:] != ts[:-1]])
+            sell, buy = signal_masks(market, p)
+
+            # Event order: per timestamp group, all SELL candidates then all BUY candidates
+            rows = np.concatenate([np.flatnonzero(sell), np.flatnonzero(buy)])
+            is_buy = np.r_[np.zeros(sell.sum(), dtype=bool), np.ones(buy.sum(), dtype=bool)]
+            group = np.searchsorted(starts, rows, side="right")
+            order = np.lexsort((rows, is_buy, group))
+            rows, is_buy = rows[order], is_buy[order]
+        prof.count("rows_visited", len(rows))
+
+        # Per-item inventory indexed by item code
+        inv_qty = [0] * len(items)
+        inv_cost = [0] * len(items)
+        sell_fraction, budget_fraction = p["max_sell_fraction"], p["buy_budget_fraction"]
+
+        with prof.phase("events"):
+            events = zip(
+                market.timestamps[rows].tolist(),
+                codes[rows].tolist(),
+                is_buy.tolist(),
+                price[rows].tolist(),
+                quantity[rows].tolist(),
+                [None] * len(rows) if market.min_buyout is None else market.min_buyout[rows].tolist(),
+            )
+            fill = self.fill
+            for timestamp, code, buying, price_i, server_qty, min_buyout in events:
+                if not buying:
+                    held = inv_qty[code]
+                    if held > 0:
+                        sell_qty = min(held, int(sell_fraction * server_qty))
+                        if sell_qty <= 0:
+                            continue
+                        sell_qty, revenue, fill_price = fill.sell(price_i, server_qty, sell_qty)
+                        if sell_qty <= 0:
+                            continue
+                        inv_qty[code] = held - sell_qty
+                        if inv_qty[code] == 0:
+                            inv_cost[code] = 0
+                        self.gold += revenue
+                        self.trade_log.append(timestamp, items[code], SELL, fill_price, sell_qty, self.gold, SELL_REASON)
+                else:
+                    budget = budget_fraction * self.gold
+                    qty, cost, fill_price = fill.buy(price_i, min_buyout, server_qty, budget)
+                    if qty <= 0:
+                        continue
+
+                    held = inv_qty[code]
+                    new_qty = held + qty
+                    inv_cost[code] = (inv_cost[code] * held + cost) / new_qty
+                    inv_qty[code] = new_qty
+                    self.gold -= cost
+                    self.trade_log.append(timestamp, items[code], BUY, fill_price, qty, self.gold, BUY_REASON)
+
+        with prof.phase("inventory"):
+            for code in np.unique(codes[rows]).tolist():
+                i = self.inventory.id_of(items[code])
+                self.inventory.qty[i] = inv_qty[code]
+                self.inventory.avg_cost[i] = inv_cost[code]
+
+    def results(self):
+        return self.trade_log.to_frame()
+
+    def portfolio_value(self, current_prices):
+        return self.inventory.value(current_prices, self.gold)
+
+
+# --- Run Simulation Locally ---
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the reinvesting AH trader.")
+    parser.add_argument("--data", help="price store directory or CSV (default: ah_store/ if present, else the CSV)")
+    parser.add_argument("--realm", metavar="REGION/REALM", help="market to run when --data holds several realms")
+    parser.add_argument("--engine", choices=ENGINES, default="loop")
+    parser.add_argument("--fill", choices=sorted(FILL_MODELS), default="flat",
+                        help="execution model: flat fills at market_value, depth walks a synthetic order book")
+    parser.add_argument("--formats", nargs="*", choices=("csv", "xlsx"), default=["csv"],
+                        help="trade log formats to write (default: csv; --formats with no value writes none)")
+    parser.add_argument("--plots", action="store_true", help="also draw the per-item holdings plots")
+    parser.add_argument("--plot-workers", type=int, default=os.cpu_count(),
+                        help="processes rendering the holdings plots (default: all cores)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"time each phase and write {PROFILE_PATH} (also enabled by WOWAH_PROFILE=1)")
+    parser.add_argument("--profile-memory", action="store_true", help="--profile plus tracemalloc peak memory per phase")
+    args = parser.parse_args(argv)
+
+    if args.profile or args.profile_memory:
+        prof = Profiler(enabled=True, memory=args.profile_memory)
+    else:
+        prof = Profiler.from_env()
+
+    # Reporting pulls in matplotlib/xlsxwriter, so only pay for it when running as a script
+    from wowah.reporting import export_trade_log, plot_holdings
+
+    with prof.phase("load_data"):
+        region, realm = parse_market(args.realm) if args.realm else (None, None)
+        df = load_market_data(args.data, region=region, realm=realm)
+
+    # Without exports only the final metrics are needed, so skip the trade log
+    bot = WoWAHTraderReinvesting(df, engine=args.engine, log_trades=bool(args.formats) or args.plots,
+                                 fill_model=FILL_MODELS[args.fill](), profiler=prof)
+    bot.simulate()
+
+    log = bot.results()
+    if args.formats:
+        with prof.phase("export"):
+            export_trade_log(log, formats=args.formats)
+
+    # Summary
+    last_prices = df.groupby("item_name", observed=True)["market_value"].last().to_dict()
+    print(f"\n💰 Final Gold: {bot.gold:,.2f}")
+    print(f"📦 Portfolio Value: {bot.portfolio_value(last_prices):,.2f} gold")
+
+    if args.plots and not log.empty:
+        with prof.phase("plots"):
+            plot_holdings(log, workers=args.plot_workers)
+
+    if prof.enabled:
+        print(f"⏱️ Profile written to {prof.write()}")
+    return bot
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import os
+
+import pandas as pd
+
+from wowah.features import prepare_market_data
+from wowah.impact_signal import HALF_LIFE, decayed_impact, load_dated_impacts
+from wowah.item_graph import load_item_graph
+from wowah.ledger import BUY, SELL, Inventory, TradeLog
+from wowah.market import MarketData
+from wowah.orderbook import FILL_MODELS, FlatFill
+from wowah.params import resolve_params
+from wowah.profiling import PROFILE_PATH, Profiler
+from wowah.simulator import signal_masks
+from wowah.store import load_market_data, parse_market
+
+# === Parameters ===
+STARTING_GOLD = 100000
+INSIGHT_PATH = "wowhead_interpreted_item_impacts.xlsx"
+
+# === Compute average impact score per item ===
+def load_impact_scores(path=INSIGHT_PATH):
+    impact_df = pd.read_excel(path)
+    return (
+        impact_df.groupby("affected_item")["impact_score"]
+        .mean()
+        .round(2)
+        .to_dict()
+    )
+
+# === Trader class ===
+class WoWAHTraderReinvesting:
+    def __init__(self, data, impact_scores, prepared=False, params=None, log_trades=True, quantity=None,
+                 fill_model=None, profiler=None, half_life=HALF_LIFE, item_graph=None):
+        if isinstance(data, MarketData):
+            # Shared, read-only and already featurized: referenced, never copied
+            self.market, self.data = data, None
+            self.quantity = data.check_overlay(quantity)  # per-run quantity noise, if any
+        elif quantity is not None:
+            raise ValueError("A quantity overlay needs MarketData input")
+        else:
+            self.market, self.data, self.quantity = None, data.copy(), None
+        self.prepared = prepared  # data already carries the market features
+        self.params = resolve_params(params)
+        self.fill = fill_model if fill_model is not None else FlatFill()  # execution layer, see wowah/orderbook.py
+        self.gold = STARTING_GOLD
+        self.impact_scores = impact_scores  # {item: mean score}, or a dated_impacts() frame for decayed scores
+        self.half_life = half_life
+        self.item_graph = item_graph  # optional ItemGraph: neighbours' signals join the buy bias
+        self.inventory = Inventory()
+        self.trade_log = TradeLog(enabled=log_trades)  # log_trades=False keeps only the trade count
+        self.profiler = profiler if profiler is not None else Profiler.from_env()  # off unless WOWAH_PROFILE is set
+
+    def prepare_data(self):
+        if self.market is not None:
+            df = self.market.frame(self.quantity)  # a view; only impact_score is a new column
+        else:
+            df = self.data if self.prepared else prepare_market_data(self.data, self.params["ma_window"])
+        if isinstance(self.impact_scores, pd.DataFrame):
+            # Dated news: each row gets the decayed score of the articles public at its timestamp
+            df["impact_score"] = decayed_impact(df["timestamp"], df["item_name"], self.impact_scores, self.half_life)
+        else:
+            df["impact_score"] = df["item_name"].map(self.impact_scores).astype(float).fillna(0)
+        if self.item_graph is not None:
+            # Reagent/substitute news and price shocks at the same timestamp, propagated once
+            df["linked_impact"] = self.item_graph.linked_scores(df["timestamp"], df["item_name"],
+                                                                df["impact_score"], df["deviation"])
+        self.data = df
+
+    def simulate(self):
+        prof = self.profiler
+        with prof.phase("prepare_data"):
+            self.prepare_data()
+        with prof.phase("simulate"):
+            self._simulate_loop()
+        if prof.enabled:
+            # Bulk counters, computed after the run instead of per row
+            sell, buy = signal_masks(MarketData.from_prepared(self.data, self.params["ma_window"]), self.params)
+            prof.count("rows", len(self.data))
+            prof.count("sell_signals", sell.sum())
+            prof.count("buy_signals", buy.sum())
+            prof.count("trades", self.trade_log.count)
+
+    def _simulate_loop(self):
+        p = self.params
+        inv = self.inventory
+        prof = self.profiler
+        prof.count("rows_visited", 2 * len(self.data))  # one SELL and one BUY pass over every row
+        has_min_buyout = "min_buyout" in self.data.columns
+        has_linked = "linked_impact" in self.data.columns
+        for timestamp, group in prof.iterate("groupby", self.data.groupby("timestamp")):
+            # SELL
+            with prof.phase("sell"):
+                for _, row in group.iterrows():
+                    item = row["item_name"]
+                    price = row["market_value"]
+                    deviation = row["deviation"]
+                    server_qty = row["quantity"]
+                    hour = row["hour"]
+                    dow = row["dow"]
+
+                    if deviation > p["sell_threshold"] or (dow in p["sell_days"] and hour in p["sell_hours"]):
+                        i = inv.id_of(item)
+                        held = inv.qty[i]
+                        if held > 0:
+                            sell_qty = min(held, int(server_qty * p["max_sell_fraction"]))
+                            if sell_qty <= 0:
+                                continue
+                            sell_qty, revenue, fill_price = self.fill.sell(price, server_qty, sell_qty)
+                            if sell_qty <= 0:
+                                continue
+                            inv.qty[i] = held - sell_qty
+                            if inv.qty[i] == 0:
+                                inv.avg_cost[i] = 0
+                            self.gold += revenue
+                            self.trade_log.append(timestamp, item, SELL, fill_price, sell_qty, self.gold, "MA spike or post-reset")
+
+            # BUY
+            with prof.phase("buy"):
+                for _, row in group.iterrows():
+                    item = row["item_name"]
+                    price = row["market_value"]
+                    deviation = row["deviation"]
+                    impact = row["impact_score"] + row["linked_impact"] if has_linked else row["impact_score"]
+                    hour = row["hour"]
+                    qty_available = row["quantity"]
+                    reset = row["weekly_reset"]
+                    min_buyout = row["min_buyout"] if has_min_buyout else None
+
+                    if deviation < p["buy_threshold"] and (hour in p["buy_hours"] or reset):
+                        multiplier = 1 + (impact / 10)  # bias towards high-impact items
+                        budget = p["buy_budget_fraction"] * self.gold * multiplier
+                        qty, cost, fill_price = self.fill.buy(price, min_buyout, qty_available, budget)
+                        if qty <= 0 or cost > self.gold:
+                            continue
+                        i = inv.id_of(item)
+                        held = inv.qty[i]
+                        new_qty = held + qty
+                        inv.avg_cost[i] = (inv.avg_cost[i] * held + cost) / new_qty
+                        inv.qty[i] = new_qty
+                        self.gold -= cost
+                        self.trade_log.append(timestamp, item, BUY, fill_price, qty, self.gold,
+                                              f"MA dip + impact score {round(impact * 10)}")
+
+    def results(self):
+        return self.trade_log.to_frame()
+
+    def portfolio_value(self, current_prices):
+        return self.inventory.value(current_prices, self.gold)
+
+
+# === Run simulation ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the insight-biased AH trader.")
+    parser.add_argument("--data", help="price store directory or CSV (default: ah_store/ if present, else the CSV)")
+    parser.add_argument("--realm", metavar="REGION/REALM", help="market to run when --data holds several realms")
+    parser.add_argument("--impacts", default=INSIGHT_PATH)
+    parser.add_argument("--half-life",
+                        help="decay each article's impact with this half-life (e.g. 7D) from its date, "
+                             "instead of one mean score per item")
+    parser.add_argument("--item-graph", help="CSV of item dependencies (source, target, relation[, weight]) "
+                                             "whose news and price shocks also bias buys")
+    parser.add_argument("--fill", choices=sorted(FILL_MODELS), default="flat",
+                        help="execution model: flat fills at market_value, depth walks a synthetic order book")
+    parser.add_argument("--formats", nargs="*", choices=("csv", "xlsx"), default=["csv"],
+                        help="trade log formats to write (default: csv; --formats with no value writes none)")
+    parser.add_argument("--plots", action="store_true", help="also draw the per-item holdings plots")
+    parser.add_argument("--plot-workers", type=int, default=os.cpu_count(),
+                        help="processes rendering the holdings plots (default: all cores)")
+    parser.add_argument("--profile", action="store_true",
+                        help=f"time each phase and write {PROFILE_PATH} (also enabled by WOWAH_PROFILE=1)")
+    parser.add_argument("--profile-memory", action="store_true", help="--profile plus tracemalloc peak memory per phase")
+    args = parser.parse_args(argv)
+
+    if args.profile or args.profile_memory:
+        prof = Profiler(enabled=True, memory=args.profile_memory)
+    else:
+        prof = Profiler.from_env()
+
+    # Reporting pulls in matplotlib/xlsxwriter, so only pay for it when running as a script
+    from wowah.reporting import export_trade_log, plot_holdings
+
+    with prof.phase("load_data"):
+        region, realm = parse_market(args.realm) if args.realm else (None, None)
+        df = load_market_data(args.data, region=region, realm=realm)
+        if args.half_life:
+            impact_scores = load_dated_impacts(args.impacts)
+        else:
+            impact_scores = load_impact_scores(args.impacts)
+
+    item_graph = load_item_graph(args.item_graph) if args.item_graph else None
+
+    # Without exports only the final metrics are needed, so skip the trade log
+    bot = WoWAHTraderReinvesting(df, impact_scores, log_trades=bool(args.formats) or args.plots,
+                                 fill_model=FILL_MODELS[args.fill](), profiler=prof,
+                                 half_life=args.half_life or HALF_LIFE, item_graph=item_graph)
+    bot.simulate()
+    log = bot.results()
+    if args.formats:
+        with prof.phase("export"):
+            export_trade_log(log, formats=args.formats)
+
+    # Final values
+    last_prices = df.groupby("item_name", observed=True)["market_value"].last().to_dict()
+    print(f"\n💰 Final Gold: {bot.gold:,.2f}")
+    print(f"📦 Portfolio Value: {bot.portfolio_value(last_prices):,.2f} gold")
+
+    # === Plot holdings ===
+    if args.plots and not log.empty:
+        with prof.phase("plots"):
+            plot_holdings(log, workers=args.plot_workers)
+
+    if prof.enabled:
+        print(f"⏱️ Profile written to {prof.write()}")
+    return bot
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+import argparse
+
+import pandas as pd
+import numpy as np
+
+from wowah.store import load_market_data
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+INITIAL_GOLD = 100000
+
+# -----------------------------
+# LOAD DATA
+# -----------------------------
+def split_half(df):
+    df = df.copy()
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df.sort_values("timestamp", inplace=True)
+
+    # Split dataset into historical (train) and live (test)
+    split_point = df["timestamp"].quantile(0.5)
+    train_df = df[df["timestamp"] <= split_point].copy()
+    test_df = df[df["timestamp"] > split_point].copy()
+    return train_df, test_df
+
+# -----------------------------
+# STRATEGY (simple moving average example)
+# -----------------------------
+SIGNAL_COLUMNS = ["timestamp", "item", "market_value", "min_buyout", "action", "price", "qty"]
+
+def generate_signals(train, test, window=5):
+    # Trailing MA per item: last value of a window-row rolling mean over the
+    # training half (NaN when the item has fewer than `window` rows)
+    rolled = train.groupby("item_name", observed=True, sort=False)["market_value"].rolling(window).mean()
+    ma = rolled.groupby(level=0, observed=True).tail(1).droplevel(-1)
+    return signals_from_ma(test, ma)
+
+def signals_from_ma(test, ma):
+    # ma: Series of trailing MA per item_name (NaN or missing = no signals)
+    # Item codes follow first appearance in test, which is the order items are visited
+    item_codes, items = pd.factorize(test["item_name"])
+    price = test["market_value"].to_numpy()
+    ma_row = test["item_name"].map(ma).to_numpy(dtype=float)
+
+    buy = price < 0.9 * ma_row
+    sell = ~buy & (price > 1.1 * ma_row)
+    qty = np.where(buy, (INITIAL_GOLD / len(items) / price).astype(np.int64), -1)  # -1 = placeholder: sell all
+
+    # Chronological, ties broken by item then row order, so simulate() needs no sort
+    rows = np.flatnonzero(buy | sell)
+    ts_ns = pd.DatetimeIndex(test["timestamp"]).as_unit("ns").asi8
+    order = np.lexsort((rows, item_codes[rows], ts_ns[rows]))
+    rows = rows[order]
+
+    return pd.DataFrame({
+        "timestamp": test["timestamp"].iloc[rows].reset_index(drop=True),
+        "item": np.asarray(items, dtype=object)[item_codes[rows]],
+        "market_value": price[rows],
+        "min_buyout": test["min_buyout"].to_numpy()[rows],
+        "action": np.where(buy[rows], "BUY", "SELL").astype(object),
+        "price": price[rows],
+        "qty": qty[rows],
+    }, columns=SIGNAL_COLUMNS)
+
+# -----------------------------
+# AS-OF PRICE INDEX
+# -----------------------------
+class AsOfPriceIndex:
+    # Per-item sorted timestamp/price arrays; price(item, ts) is the latest
+    # market_value at or before ts, found by binary search
+    def __init__(self, df):
+        times = pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8
+        values = df["market_value"].to_numpy()
+        self._series = {}
+        for item, idx in df.groupby("item_name", sort=False, observed=True).indices.items():
+            order = np.argsort(times[idx], kind="stable")
+            self._series[item] = (times[idx][order], values[idx][order])
+
+    def price(self, item, ts):
+        series = self._series.get(item)
+        if series is None:
+            return None
+        times, values = series
+        pos = np.searchsorted(times, pd.Timestamp(ts).as_unit("ns").value, side="right") - 1
+        return None if pos < 0 else values[pos]
+
+# -----------------------------
+# SIMULATION
+# -----------------------------
+def take_snapshot(ts, gold, holdings, price_index):
+    snapshot = {"timestamp": ts, "gold": gold}
+    for h_item, h_qty in holdings.items():
+        current_price = price_index.price(h_item, ts)
+        if current_price is not None:
+            snapshot[f"asset_{h_item}"] = h_qty * current_price
+    return snapshot
+
+def simulate(signals, prices, snapshot_freq=None):
+    # signals: generate_signals() frame, already in time order (a list of signal
+    # dicts is still accepted); prices: the frame signals were generated from
+    # (test split); snapshot_freq: None snapshots after every signal, a
+    # Timedelta/offset string thins them out
+    if not isinstance(signals, pd.DataFrame):
+        signals = pd.DataFrame(list(signals), columns=SIGNAL_COLUMNS)
+        signals = signals.sort_values("timestamp", kind="stable")
+    price_index = prices if isinstance(prices, AsOfPriceIndex) else AsOfPriceIndex(prices)
+    if snapshot_freq is not None:
+        snapshot_freq = pd.Timedelta(snapshot_freq)
+    gold = INITIAL_GOLD
+    holdings = {}
+    log = []
+    portfolio = []
+    last_snapshot = None
+    current = True  # the last snapshot reflects the latest state
+
+    columns = (signals[c].tolist() for c in ["timestamp", "item", "action", "qty", "price"])
+    for ts, item, action, qty, price in zip(*columns):
+        if action == "BUY" and qty > 0:
+            cost = qty * price
+            if gold >= cost:
+                gold -= cost
+                holdings[item] = holdings.get(item, 0) + qty
+                log.append((ts, item, "BUY", qty, price, gold))
+        elif action == "SELL":
+            if item in holdings and holdings[item] > 0:
+                qty = holdings[item]
+                revenue = qty * price
+                gold += revenue
+                log.append((ts, item, "SELL", qty, price, gold))
+                holdings[item] = 0
+
+        # Portfolio snapshot, O(held items) via the as-of index
+        current = snapshot_freq is None or last_snapshot is None or ts >= last_snapshot + snapshot_freq
+        if current:
+            portfolio.append(take_snapshot(ts, gold, holdings, price_index))
+            last_snapshot = ts
+
+    # Always close with the end state when snapshots are thinned
+    if not current:
+        portfolio.append(take_snapshot(ts, gold, holdings, price_index))
+
+    trade_log = pd.DataFrame(log, columns=["timestamp", "item", "action", "qty", "price", "gold"])
+    if not portfolio:  # no signals: nothing traded, no snapshots taken
+        return trade_log, pd.DataFrame(columns=["timestamp", "gold", "total_value"])
+    portfolio_df = pd.DataFrame(portfolio).fillna(0)
+    portfolio_df["total_value"] = portfolio_df.drop(columns=["timestamp"]).sum(axis=1)
+
+    return trade_log, portfolio_df
+
+# -----------------------------
+# RUN
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Half/half MA backtest.")
+    parser.add_argument("--data", help="price store directory or CSV (default: ah_store/ if present, else the CSV)")
+    parser.add_argument("--snapshot-freq", help="record portfolio snapshots at this cadence (e.g. 1h, 1D) instead of per signal")
+    args = parser.parse_args(argv)
+
+    import matplotlib.pyplot as plt
+
+    train_df, test_df = split_half(load_market_data(args.data))
+    signals = generate_signals(train_df, test_df)
+    results_df, portfolio_df = simulate(signals, test_df, args.snapshot_freq)
+
+    # Save results
+    results_df.to_excel("simulated_trades_V2.xlsx", index=False)
+
+    # -----------------------------
+    # VISUALIZE HOLDINGS
+    # -----------------------------
+    for item in results_df["item"].unique():
+        sub = results_df[results_df["item"] == item]
+        sub = sub.sort_values("timestamp")
+        sub["cumulative_qty"] = sub.apply(
+            lambda row: row["qty"] if row["action"] == "BUY" else -row["qty"], axis=1
+        ).cumsum()
+
+        plt.figure(figsize=(10, 4))
+        plt.plot(sub["timestamp"], sub["cumulative_qty"], drawstyle="steps-post")
+        plt.title(f"Holdings Over Time: {item}")
+        plt.xlabel("Timestamp")
+        plt.ylabel("Qty Held")
+        plt.grid(True)
+        plt.tight_layout()
+        plt.savefig(f"holdings_{item.replace(' ', '_')}.png")
+        plt.close()
+
+    # -----------------------------
+    # GOLD + ASSET VALUE OVER LAST 2 WEEKS
+    # -----------------------------
+    two_weeks_ago = portfolio_df["timestamp"].max() - pd.Timedelta(days=14)
+    recent_portfolio = portfolio_df[portfolio_df["timestamp"] >= two_weeks_ago]
+
+    plt.figure(figsize=(10, 5))
+    plt.plot(recent_portfolio["timestamp"], recent_portfolio["total_value"], color='darkgreen')
+    plt.title("Total Portfolio Value Over Last 2 Weeks")
+    plt.xlabel("Timestamp")
+    plt.ylabel("Gold + Asset Value")
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig("portfolio_value_last_2_weeks.png")
+    plt.close()
+
+    print("✅ Simulation complete. Trades saved to Excel. Holdings plots and portfolio value plot generated.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# === Layout ===
+# <store>/manifest.json            schema + per-item row counts and time bounds
+# <store>/items/<part>/<col>.bin   one raw little-endian column per file, memory-mapped on read
+#
+# Timestamps are stored as int64 nanoseconds (UTC when the source was tz-aware),
+# so loading never parses dates. Rows inside a partition are sorted by timestamp,
+# which lets time-range reads binary search instead of scanning.
+STORE_PATH = "ah_store"
+CSV_PATH = "aggregated_wow_ah_monthly.csv"
+MANIFEST = "manifest.json"
+KEY_COLUMNS = ("item_name", "timestamp")
+
+# Markets: <store>/markets/<region>/<realm>/ is one AHPriceStore per realm. The
+# store root itself holds the default market, so a single-realm store from
+# before realms existed reads as eu/burning-legion unchanged.
+MARKETS_DIR = "markets"
+REALM_COLUMNS = ("region", "realm")
+DEFAULT_REGION = "eu"
+DEFAULT_REALM = "burning-legion"
+CSV_CHUNK_ROWS = 500_000  # rows per chunk when filtering one realm out of a CSV
+
+
+class AHPriceStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self.manifest = self._load_manifest()
+        self._stale_parts = []
+
+    # --- manifest ---
+    def _load_manifest(self):
+        manifest_path = os.path.join(self.path, MANIFEST)
+        if not os.path.exists(manifest_path):
+            return {"version": 1, "tz": None, "columns": {}, "items": {}}
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = os.path.join(self.path, MANIFEST + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.path, MANIFEST))
+
+    @property
+    def items(self):
+        return sorted(self.manifest["items"])
+
+    @property
+    def columns(self):
+        return list(self.manifest["columns"])
+
+    def high_water_mark(self, item):
+        meta = self.manifest["items"].get(item)
+        if not meta or not meta["rows"]:
+            return None
+        return self._to_timestamp(meta["last"])
+
+    # --- timestamps ---
+    def _to_ns(self, values):
+        ts = pd.to_datetime(values)
+        if getattr(ts.dt, "tz", None) is not None:
+            if self.manifest["tz"] is None and not self.manifest["items"]:
+                self.manifest["tz"] = str(ts.dt.tz)
+            ts = ts.dt.tz_convert("UTC").dt.tz_localize(None)
+        return ts.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+    def _bound_ns(self, value):
+        ts = pd.Timestamp(value)
+        if ts.tzinfo is not None:
+            ts = ts.tz_convert("UTC").tz_localize(None)
+        elif self.manifest["tz"] is not None:
+            ts = ts.tz_localize(self.manifest["tz"]).tz_convert("UTC").tz_localize(None)
+        return ts.as_unit("ns").value
+
+    def _to_timestamp(self, ns):
+        ts = pd.Timestamp(ns, unit="ns")
+        if self.manifest["tz"] is not None:
+            ts = ts.tz_localize("UTC").tz_convert(self.manifest["tz"])
+        return ts
+
+    # --- column files ---
+    def _column_path(self, item, column):
+        return os.path.join(self.path, "items", self.manifest["items"][item]["part"], f"{column}.bin")
+
+    def _dtype(self, column):
+        return np.dtype("<i8") if column == "timestamp" else np.dtype(self.manifest["columns"][column])
+
+    def _column(self, item, column):
+        rows = self.manifest["items"][item]["rows"]
+        if rows == 0:
+            return np.empty(0, dtype=self._dtype(column))
+        return np.memmap(self._column_path(item, column), dtype=self._dtype(column), mode="r", shape=(rows,))
+
+    def _write_column(self, item, column, values, offset):
+        # Truncate to the committed row count first, so bytes from a write that
+        # crashed before its manifest update are overwritten rather than exposed.
+        path = self._column_path(item, column)
+        itemsize = self._dtype(column).itemsize
+        mode = "r+b" if os.path.exists(path) else "w+b"
+        with open(path, mode) as f:
+            f.truncate(offset * itemsize)
+            f.seek(offset * itemsize)
+            f.write(np.ascontiguousarray(values, dtype=self._dtype(column)).tobytes())
+
+    # --- writes ---
+    def append(self, df):
+        missing = [c for c in KEY_COLUMNS if c not in df.columns]
+        if missing:
+            raise ValueError(f"Missing key columns: {missing}")
+
+        value_columns = [c for c in df.columns if c not in KEY_COLUMNS]
+        if not self.manifest["columns"]:
+            for col in value_columns:
+                if not pd.api.types.is_numeric_dtype(df[col]):
+                    raise ValueError(f"Column {col!r} is not numeric and cannot be stored")
+                self.manifest["columns"][col] = np.dtype(df[col].dtype).newbyteorder("<").str
+        elif set(value_columns) != set(self.manifest["columns"]):
+            raise ValueError(f"Columns {sorted(value_columns)} do not match store schema {sorted(self.columns)}")
+
+        for col in self.columns:
+            if not np.can_cast(df[col].dtype, self._dtype(col), casting="same_kind"):
+                raise ValueError(f"Column {col!r} has dtype {df[col].dtype}, store expects {self._dtype(col)}")
+
+        ts_ns = self._to_ns(df["timestamp"])
+        arrays = {c: df[c].to_numpy() for c in self.columns}
+        written = 0
+        for item, idx in df.groupby("item_name", observed=True, sort=False).indices.items():
+            written += self._append_item(item, ts_ns[idx], {c: v[idx] for c, v in arrays.items()})
+        self._save_manifest()
+        for part in self._stale_parts:
+            shutil.rmtree(os.path.join(self.path, "items", part), ignore_errors=True)
+        self._stale_parts = []
+        return written
+
+    def _append_item(self, item, ts, values):
+        meta = self.manifest["items"].get(item)
+        if meta is None:
+            meta = {"part": f"item_{len(self.manifest['items']):05d}", "gen": 0, "rows": 0, "first": None, "last": None}
+            self.manifest["items"][item] = meta
+            os.makedirs(os.path.join(self.path, "items", meta["part"]), exist_ok=True)
+
+        # Sort the batch and keep the last row per timestamp
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        keep = np.r_[ts[1:] != ts[:-1], True]
+        ts = ts[keep]
+        values = {c: v[order][keep] for c, v in values.items()}
+
+        if meta["rows"] and ts.size and ts[0] <= meta["last"]:
+            # Overlaps stored history: merge in memory and rewrite this partition only.
+            # The merge goes to a new generation directory; the old one is dropped once
+            # the manifest points at the new one, so a crash leaves the store readable.
+            merged_ts = np.concatenate([np.array(self._column(item, "timestamp")), ts])
+            order = np.argsort(merged_ts, kind="stable")
+            merged_ts = merged_ts[order]
+            keep = np.r_[merged_ts[1:] != merged_ts[:-1], True]  # newer batch wins on duplicates
+            merged = {
+                col: np.concatenate([np.array(self._column(item, col)), values[col]])[order][keep]
+                for col in self.columns
+            }
+            ts = merged_ts[keep]
+
+            self._stale_parts.append(meta["part"])
+            meta["gen"] = meta.get("gen", 0) + 1
+            meta["part"] = f"{meta['part'].split('.')[0]}.{meta['gen']}"
+            os.makedirs(os.path.join(self.path, "items", meta["part"]), exist_ok=True)
+            for col in self.columns:
+                self._write_column(item, col, merged[col], 0)
+            self._write_column(item, "timestamp", ts, 0)
+            added = ts.size - meta["rows"]
+            meta["rows"] = int(ts.size)
+        else:
+            for col in self.columns:
+                self._write_column(item, col, values[col], meta["rows"])
+            self._write_column(item, "timestamp", ts, meta["rows"])
+            added = int(ts.size)
+            meta["rows"] += added
+
+        if meta["rows"]:
+            meta["first"] = int(self._column(item, "timestamp")[0])
+            meta["last"] = int(self._column(item, "timestamp")[-1])
+        return int(added)
+
+    # --- reads ---
+    def read(self, items=None, columns=None, start=None, end=None):
+        names = self.items if items is None else sorted(set(items) & set(self.manifest["items"]))
+        columns = self.columns if columns is None else [c for c in columns if c not in KEY_COLUMNS]
+        lo_ns = None if start is None else self._bound_ns(start)
+        hi_ns = None if end is None else self._bound_ns(end)
+
+        ts_parts, counts, col_parts = [], [], {c: [] for c in columns}
+        for name in names:
+            ts = self._column(name, "timestamp")
+            lo = 0 if lo_ns is None else np.searchsorted(ts, lo_ns, side="left")
+            hi = ts.size if hi_ns is None else np.searchsorted(ts, hi_ns, side="right")
+            ts_parts.append(ts[lo:hi])
+            counts.append(hi - lo)
+            for col in columns:
+                col_parts[col].append(self._column(name, col)[lo:hi])
+
+        ts = np.concatenate(ts_parts) if ts_parts else np.empty(0, dtype=np.int64)
+        timestamps = pd.DatetimeIndex(ts.view("datetime64[ns]"))
+        if self.manifest["tz"] is not None:
+            timestamps = timestamps.tz_localize("UTC").tz_convert(self.manifest["tz"])
+
+        codes = np.repeat(np.arange(len(names), dtype=np.int32), counts)
+        df = pd.DataFrame({
+            "timestamp": timestamps,
+            "item_name": pd.Categorical.from_codes(codes, categories=names),
+        })
+        for col in columns:
+            parts = col_parts[col]
+            df[col] = np.concatenate(parts) if parts else np.empty(0, dtype=self._dtype(col))
+        return df
+
+    def info(self):
+        return pd.DataFrame([
+            {
+                "item_name": name,
+                "rows": meta["rows"],
+                "first": self._to_timestamp(meta["first"]) if meta["rows"] else None,
+                "last": self._to_timestamp(meta["last"]) if meta["rows"] else None,
+            }
+            for name, meta in sorted(self.manifest["items"].items())
+        ])
+
+
+# === Multi-realm store ===
+def check_slug(value):
+    # Region/realm names become directory names
+    value = str(value)
+    if not value or value in (".", "..") or "/" in value or "\\" in value:
+        raise ValueError(f"Invalid region/realm name: {value!r}")
+    return value
+
+
+def parse_market(value):
+    # "eu/burning-legion" -> ("eu", "burning-legion")
+    region, sep, realm = str(value).strip("/").lower().partition("/")
+    if not sep:
+        raise ValueError(f"Expected REGION/REALM, got {value!r}")
+    return check_slug(region), check_slug(realm)
+
+
+class RealmStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._markets = {}
+
+    def market(self, region=DEFAULT_REGION, realm=DEFAULT_REALM):
+        key = (check_slug(region), check_slug(realm))
+        store = self._markets.get(key)
+        if store is None:
+            path = self.path if key == (DEFAULT_REGION, DEFAULT_REALM) else os.path.join(self.path, MARKETS_DIR, *key)
+            store = self._markets[key] = AHPriceStore(path)
+        return store
+
+    @property
+    def markets(self):
+        # (region, realm) pairs with stored data, sorted
+        found = set()
+        if os.path.exists(os.path.join(self.path, MANIFEST)):
+            found.add((DEFAULT_REGION, DEFAULT_REALM))
+        root = os.path.join(self.path, MARKETS_DIR)
+        if os.path.isdir(root):
+            for region in os.listdir(root):
+                for realm in os.listdir(os.path.join(root, region)):
+                    if os.path.exists(os.path.join(root, region, realm, MANIFEST)):
+                        found.add((region, realm))
+        return sorted(found)
+
+    def high_water_mark(self, item, region=DEFAULT_REGION, realm=DEFAULT_REALM):
+        return self.market(region, realm).high_water_mark(item)
+
+    def append(self, df):
+        # Rows without region/realm columns belong to the default market
+        if not set(REALM_COLUMNS) <= set(df.columns):
+            return self.market().append(df)
+        written = 0
+        for (region, realm), rows in df.groupby(list(REALM_COLUMNS), observed=True, sort=True):
+            written += self.market(region, realm).append(rows.drop(columns=list(REALM_COLUMNS)))
+        return written
+
+    def read(self, region=DEFAULT_REGION, realm=DEFAULT_REALM, **read_kwargs):
+        return self.market(region, realm).read(**read_kwargs)
+
+    def info(self):
+        frames = []
+        for region, realm in self.markets:
+            info = self.market(region, realm).info()
+            info.insert(0, "realm", realm)
+            info.insert(0, "region", region)
+            frames.append(info)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=[*REALM_COLUMNS, "item_name", "rows"])
+
+
+# === Loading helpers used by the simulators ===
+def list_markets(path=None):
+    if path is None:
+        path = STORE_PATH if os.path.isdir(STORE_PATH) else CSV_PATH
+    if os.path.isdir(path):
+        return RealmStore(path).markets
+    columns = pd.read_csv(path, nrows=0).columns
+    if not set(REALM_COLUMNS) <= set(columns):
+        return [(DEFAULT_REGION, DEFAULT_REALM)]
+    pairs = pd.read_csv(path, usecols=list(REALM_COLUMNS), dtype=str).drop_duplicates()
+    return sorted(map(tuple, pairs.to_numpy().tolist()))
+
+
+def load_market_data(path=None, region=None, realm=None, **read_kwargs):
+    # One market's rows. region/realm may be left out when the source holds a single market.
+    if path is None:
+        path = STORE_PATH if os.path.isdir(STORE_PATH) else CSV_PATH
+    if region is None and realm is None:
+        markets = list_markets(path)
+        if len(markets) > 1:
+            raise ValueError(f"{path} holds {len(markets)} realms; pass region= and realm= "
+                             f"(or shard them with realm_simulation.py)")
+        region, realm = markets[0] if markets else (DEFAULT_REGION, DEFAULT_REALM)
+    region, realm = region or DEFAULT_REGION, realm or DEFAULT_REALM
+    if os.path.isdir(path):
+        return RealmStore(path).read(region, realm, **read_kwargs)
+
+    header = pd.read_csv(path, nrows=0)
+    if not set(REALM_COLUMNS) <= set(header.columns):
+        return pd.read_csv(path) if (region, realm) == (DEFAULT_REGION, DEFAULT_REALM) else header
+    # Filtered chunk by chunk, so only this realm's rows are ever held in memory
+    parts = [header] + [
+        chunk[(chunk["region"] == region) & (chunk["realm"] == realm)]
+        for chunk in pd.read_csv(path, chunksize=CSV_CHUNK_ROWS, dtype={"region": str, "realm": str})
+    ]
+    return pd.concat(parts[1:] or parts, ignore_index=True).drop(columns=list(REALM_COLUMNS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the columnar AH price store.")
+    parser.add_argument("--store", default=STORE_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    import_cmd = sub.add_parser("import", help="append a scraped CSV to the store")
+    import_cmd.add_argument("csv", nargs="?", default=CSV_PATH)
+    sub.add_parser("info", help="show per-realm, per-item row counts and time bounds")
+    args = parser.parse_args(argv)
+
+    # CSVs with region/realm columns are split into one market per realm
+    store = RealmStore(args.store)
+    if args.command == "import":
+        added = store.append(pd.read_csv(args.csv))
+        print(f"✅ Imported {added} rows from {args.csv} into {args.store}")
+    else:
+        print(store.info().to_string(index=False))
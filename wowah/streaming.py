@@ -0,0 +1,145 @@
+import math
+
+import pandas as pd
+
+from wowah.simulator import WoWAHTraderReinvesting
+
+
+# === Incremental rolling mean ===
+# Ring buffer plus running sum, so each update is O(1) regardless of history
+# length. The sum uses the same compensated add/remove steps as pandas'
+# rolling().mean(), so the values match prepare_market_data bit for bit.
+class RollingMean:
+    __slots__ = ("window", "values", "pos", "nobs", "sum_x", "comp_add", "comp_remove",
+                 "neg_ct", "same_ct", "prev")
+
+    def __init__(self, window):
+        self.window = window
+        self.values = []
+        self.pos = 0
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_ct = 0
+        self.same_ct = 0
+        self.prev = math.nan
+
+    def mean(self):
+        if self.nobs == 0:
+            return math.nan
+        result = self.sum_x / self.nobs
+        if self.same_ct >= self.nobs:
+            result = self.prev
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def push(self, value):
+        if len(self.values) < self.window:
+            self.values.append(value)
+        else:
+            self._remove(self.values[self.pos])
+            self.values[self.pos] = value
+            self.pos = (self.pos + 1) % self.window
+        self._add(value)
+
+    def _add(self, value):
+        if math.isnan(value):
+            return
+        self.nobs += 1
+        y = value - self.comp_add
+        t = self.sum_x + y
+        self.comp_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct += 1
+        self.same_ct = self.same_ct + 1 if value == self.prev else 1
+        self.prev = value
+
+    def _remove(self, value):
+        if math.isnan(value):
+            return
+        self.nobs -= 1
+        y = -value - self.comp_remove
+        t = self.sum_x + y
+        self.comp_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct -= 1
+
+
+# === Incremental market features ===
+# Per tick: deviation from the MA of the item's previous ma_window prices
+# (the shifted rolling mean of prepare_market_data), then the price enters the buffer.
+class IncrementalFeatures:
+    def __init__(self, ma_window):
+        self.ma_window = ma_window
+        self._ma = {}
+
+    def update(self, item, price):
+        ma = self._ma.get(item)
+        if ma is None:
+            ma = self._ma[item] = RollingMean(self.ma_window)
+        mean = ma.mean()
+        ma.push(price)
+        if math.isnan(mean):
+            return math.nan
+        if mean == 0:  # the batch path divides arrays: x/0 is +-inf, 0/0 is nan
+            return math.nan if price == 0 or math.isnan(price) else math.copysign(math.inf, price)
+        return (price - mean) / mean
+
+    @staticmethod
+    def calendar(timestamp):
+        hour, dow = timestamp.hour, timestamp.dayofweek
+        return hour, dow, int(dow == 2 and 8 <= hour <= 12)
+
+
+# === Streaming trader ===
+# Same rules as WoWAHTraderReinvesting, fed one snapshot (or tick) at a time.
+# Each call returns the trade-log rows it produced. Replaying a stored history
+# snapshot by snapshot reproduces the batch backtest exactly.
+class StreamingTrader(WoWAHTraderReinvesting):
+    def __init__(self, data=None, params=None, fill_model=None):
+        super().__init__(pd.DataFrame() if data is None else data, prepared=True, params=params, fill_model=fill_model)
+        self.features = IncrementalFeatures(self.params["ma_window"])
+
+    def on_snapshot(self, timestamp, items, prices, quantities, min_buyouts=None):
+        # All rows share one timestamp: SELLs first, then BUYs, as in the backtest
+        timestamp = pd.Timestamp(timestamp)
+        hour, dow, reset = self.features.calendar(timestamp)
+        deviations = [self.features.update(item, price) for item, price in zip(items, prices)]
+        quantities = [0 if qty is None or qty != qty else qty for qty in quantities]  # missing -> nothing listed
+
+        first = len(self.trade_log)
+        for item, price, deviation, qty in zip(items, prices, deviations, quantities):
+            self._sell_row(timestamp, item, price, deviation, hour, dow, qty)
+        if min_buyouts is None:
+            min_buyouts = [None] * len(items)
+        for item, price, deviation, qty, min_buyout in zip(items, prices, deviations, quantities, min_buyouts):
+            self._buy_row(timestamp, item, price, deviation, hour, reset, qty, min_buyout)
+        return [self.trade_log.row(i) for i in range(first, len(self.trade_log))]
+
+    def on_tick(self, timestamp, item, price, quantity, min_buyout=None):
+        # A tick is a one-row snapshot; its SELL/BUY decision is made immediately
+        return self.on_snapshot(timestamp, [item], [price], [quantity], [min_buyout])
+
+    def replay(self, data):
+        # Same row order as prepare_market_data: by timestamp, then item name
+        columns = ["timestamp", "item_name", "market_value", "quantity"]
+        df = data[columns + (["min_buyout"] if "min_buyout" in data.columns else [])].copy()
+        df["timestamp"] = pd.to_datetime(df["timestamp"])
+        df.sort_values(["timestamp", "item_name"], inplace=True)
+        for timestamp, group in df.groupby("timestamp", sort=True):
+            self.on_snapshot(
+                timestamp,
+                group["item_name"].tolist(),
+                group["market_value"].tolist(),
+                group["quantity"].tolist(),
+                group["min_buyout"].tolist() if "min_buyout" in group.columns else None,
+            )
+
+    def simulate(self):
+        self.replay(self._frame())
@@ -0,0 +1,234 @@
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from wowah.batched import BatchedTrader
+from wowah.market import MarketData
+from wowah.params import DEFAULT_PARAMS, resolve_params
+from wowah.simulator import STARTING_GOLD, WoWAHTraderReinvesting as VanillaTrader
+from wowah.simulator_insights import INSIGHT_PATH, WoWAHTraderReinvesting as InsightfulTrader
+from wowah.simulator_insights import load_impact_scores
+from wowah.store import load_market_data
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+# A space maps a parameter to a list of candidate values, or to a (low, high)
+# tuple for a continuous range. Integer bounds sample integers.
+DEFAULT_SPACE = {
+    "ma_window": [5, 7, 10, 14],
+    "buy_threshold": (-0.20, -0.05),
+    "sell_threshold": (0.05, 0.20),
+    "buy_budget_fraction": (0.05, 0.25),
+    "max_sell_fraction": [0.005, 0.01, 0.02],
+    "buy_hours": [(3, 4, 5, 6), (2, 3, 4, 5, 6, 7), (4, 5)],
+    "sell_hours": [(15, 16, 17), (14, 15, 16, 17, 18)],
+}
+METHODS = ("grid", "random", "lhs")
+MODELS = ("vanilla", "insights")
+ENGINES = ("batched", "trader")  # one BatchedTrader per chunk, or one trader per config
+BATCH_SIZE = 256  # configs advanced together by one BatchedTrader
+GRID_POINTS = 3  # values per continuous range in a grid
+SAMPLES = 100
+SEED = 42
+OUT_PATH = "sweep_results.csv"
+
+
+# -----------------------------
+# SAMPLERS
+# -----------------------------
+def _is_range(values):
+    return isinstance(values, tuple) and len(values) == 2 and all(isinstance(v, (int, float)) for v in values)
+
+def _from_unit(values, u):
+    # Map u in [0, 1) onto one candidate of the dimension
+    if _is_range(values):
+        low, high = values
+        if isinstance(low, int) and isinstance(high, int):
+            return min(int(low + u * (high - low + 1)), high)
+        return low + u * (high - low)
+    return values[min(int(u * len(values)), len(values) - 1)]
+
+def _check_space(space):
+    unknown = set(space) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown strategy parameters: {sorted(unknown)}")
+
+def grid(space, points=GRID_POINTS):
+    _check_space(space)
+    axes = []
+    for values in space.values():
+        if _is_range(values):
+            low, high = values
+            axis = np.linspace(low, high, points)
+            if isinstance(low, int) and isinstance(high, int):
+                axis = np.unique(np.round(axis).astype(int))
+            values = axis.tolist()
+        axes.append(values)
+    return [dict(zip(space, combo)) for combo in itertools.product(*axes)]
+
+def random_samples(space, n=SAMPLES, seed=SEED):
+    _check_space(space)
+    u = np.random.default_rng(seed).random((n, len(space)))
+    return [{name: _from_unit(values, u[i, j]) for j, (name, values) in enumerate(space.items())} for i in range(n)]
+
+def latin_hypercube(space, n=SAMPLES, seed=SEED):
+    # Each dimension is cut into n equal strata and every stratum is hit once,
+    # so n samples cover each parameter's range evenly.
+    _check_space(space)
+    rng = np.random.default_rng(seed)
+    u = np.column_stack([(rng.permutation(n) + rng.random(n)) / n for _ in space]) if space else np.empty((n, 0))
+    return [{name: _from_unit(values, u[i, j]) for j, (name, values) in enumerate(space.items())} for i in range(n)]
+
+def sample_configs(space, method="grid", n=SAMPLES, seed=SEED, points=GRID_POINTS):
+    if method == "grid":
+        return grid(space, points)
+    if method == "random":
+        return random_samples(space, n, seed)
+    if method == "lhs":
+        return latin_hypercube(space, n, seed)
+    raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+
+def load_space(path):
+    # JSON has no tuples: a range is written {"range": [low, high]}
+    with open(path) as f:
+        raw = json.load(f)
+    return {
+        name: tuple(values["range"]) if isinstance(values, dict) else values
+        for name, values in raw.items()
+    }
+
+
+# -----------------------------
+# EVALUATION
+# -----------------------------
+# Filled once per worker by init_worker: one featurized frame per MA window
+_worker = {}
+
+def init_worker(features, last_prices, model, impact_scores):
+    _worker["features"] = features
+    _worker["last_prices"] = last_prices
+    _worker["model"] = model
+    _worker["impact_scores"] = impact_scores
+
+def run_config(config_id, params):
+    params = resolve_params(params)
+    features = _worker["features"][params["ma_window"]]
+    if _worker["model"] == "insights":
+        bot = InsightfulTrader(features, _worker["impact_scores"], params=params, log_trades=False)
+    else:
+        bot = VanillaTrader(features, engine="numpy", params=params, log_trades=False)
+    bot.simulate()
+
+    # portfolio_value() already includes gold; holdings are the remainder
+    total_value = bot.portfolio_value(_worker["last_prices"])
+    return [result_row(config_id, params, len(bot.trade_log), bot.gold, total_value)]
+
+def run_chunk(config_ids, configs):
+    # All configs of a chunk share one MA window (see run_sweep)
+    features = _worker["features"][configs[0]["ma_window"]]
+    impact_scores = _worker["impact_scores"] if _worker["model"] == "insights" else None
+    bot = BatchedTrader(features, configs, impact_scores=impact_scores)
+    bot.simulate()
+    out = bot.results(_worker["last_prices"])
+    return [
+        result_row(config_id, params, trades, gold, total)
+        for config_id, params, trades, gold, total in zip(
+            config_ids, bot.configs, out["trades"].tolist(), out["final_gold"].tolist(), out["total_value"].tolist()
+        )
+    ]
+
+def result_row(config_id, params, trades, final_gold, total_value):
+    return {
+        "config": config_id,
+        **{k: "-".join(map(str, v)) if isinstance(v, tuple) else v for k, v in params.items()},
+        "trades": trades,
+        "final_gold": final_gold,
+        "holdings_value": total_value - final_gold,
+        "total_value": total_value,
+        "return_pct": 100 * (total_value / STARTING_GOLD - 1),
+    }
+
+def make_chunks(configs, workers, batch_size=BATCH_SIZE):
+    # Group by MA window, then split each window so every worker gets work
+    by_window = {}
+    for config_id, params in enumerate(configs):
+        by_window.setdefault(params["ma_window"], []).append(config_id)
+    size = max(1, min(batch_size, -(-len(configs) // workers)))
+    chunks = []
+    for ids in by_window.values():
+        chunks.extend(ids[i:i + size] for i in range(0, len(ids), size))
+    return chunks
+
+def run_sweep(df, configs, model="vanilla", impact_scores=None, workers=None, engine="batched",
+              batch_size=BATCH_SIZE):
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}, expected one of {MODELS}")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    configs = [resolve_params(c) for c in configs]
+
+    # One feature pass per distinct MA window, shared by every config using it
+    windows = sorted({c["ma_window"] for c in configs})
+    features = {w: MarketData.from_frame(df, w) for w in windows}
+    last_prices = df.groupby("item_name", observed=True)["market_value"].last().to_dict()
+
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(features, last_prices, model, impact_scores or {}),
+    ) as executor:
+        if engine == "batched":
+            chunks = make_chunks(configs, workers, batch_size)
+            parts = executor.map(run_chunk, chunks, [[configs[i] for i in ids] for ids in chunks])
+        else:
+            chunksize = max(1, len(configs) // (4 * workers))
+            parts = executor.map(run_config, range(len(configs)), configs, chunksize=chunksize)
+        rows = [row for part in parts for row in part]
+
+    results = pd.DataFrame(rows).sort_values(["total_value", "config"], ascending=[False, True], ignore_index=True)
+    results.insert(0, "rank", np.arange(1, len(results) + 1))
+    return results
+
+
+# -----------------------------
+# RUN
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep the trader's strategy parameters and rank configs by total value.")
+    parser.add_argument("--data", help="price store directory or CSV (default: ah_store/ if present, else the CSV)")
+    parser.add_argument("--model", choices=MODELS, default="vanilla")
+    parser.add_argument("--impacts", default=INSIGHT_PATH, help="impact scores for --model insights")
+    parser.add_argument("--method", choices=METHODS, default="lhs")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help="configs drawn by random/lhs")
+    parser.add_argument("--points", type=int, default=GRID_POINTS, help="grid values per continuous range")
+    parser.add_argument("--space", help='JSON file of {param: [values] or {"range": [low, high]}}')
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--engine", choices=ENGINES, default="batched")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="configs per batched pass")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--out", default=OUT_PATH)
+    args = parser.parse_args(argv)
+
+    space = load_space(args.space) if args.space else DEFAULT_SPACE
+    configs = sample_configs(space, args.method, args.samples, args.seed, args.points)
+    impact_scores = load_impact_scores(args.impacts) if args.model == "insights" else None
+
+    windows = len({resolve_params(c)["ma_window"] for c in configs})
+    print(f"⏳ Evaluating {len(configs)} configs over {windows} MA windows...")
+    results = run_sweep(
+        load_market_data(args.data), configs, args.model, impact_scores, args.workers, args.engine, args.batch_size
+    )
+    results.to_csv(args.out, index=False)
+
+    print(f"\n\U0001F3C6 Top {args.top} configs by total value:")
+    print(results.head(args.top).to_string(index=False))
+    print(f"\n✅ Saved {len(results)} configs to {args.out}")
+    return results
@@ -0,0 +1,60 @@
+import gzip
+import json
+
+import numpy as np
+import pandas as pd
+
+
+# === Synthetic market (same schema as aggregated_wow_ah_monthly.csv) ===
+# Seeded: the same (n_items, n_snapshots, seed) always gives the same frame.
+def synthetic_market(n_items=50, n_snapshots=24 * 90, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2024-01-01", periods=n_snapshots, freq="h")
+    base = rng.uniform(5, 500, size=n_items)
+    walk = np.exp(np.cumsum(rng.normal(0, 0.05, size=(n_snapshots, n_items)), axis=0))
+    market_value = np.round(base * walk, 2)
+    return pd.DataFrame({
+        "timestamp": np.repeat(timestamps, n_items).astype(str),
+        "item_name": np.tile([f"Item {i}" for i in range(n_items)], n_snapshots),
+        "market_value": market_value.ravel(),
+        "min_buyout": np.round(market_value.ravel() * rng.uniform(0.85, 1.0, size=market_value.size), 2),
+        "quantity": rng.integers(50, 20000, size=market_value.size),
+    })
+
+
+def synthetic_impacts(items, seed=0):
+    # Integer impact scores in [-10, 10], as produced by the news analysis
+    rng = np.random.default_rng(seed)
+    return dict(zip(items, rng.integers(-10, 11, size=len(items)).tolist()))
+
+
+# === Synthetic scraper payloads ===
+def monthly_payloads(data):
+    # One gzipped monthly JSON body per item, shaped like the wowpricehub XHR
+    # that AH_Scraper.py decodes
+    bodies = []
+    for item, rows in data.groupby("item_name", sort=False):
+        auctions = pd.DataFrame({
+            "dateTime": pd.to_datetime(rows["timestamp"]).dt.strftime("%Y-%m-%dT%H:%M:%S"),
+            "price": rows["market_value"],
+            "minBuyout": rows["min_buyout"],
+            "quantity": rows["quantity"],
+        }).to_dict("records")
+        body = json.dumps({"item": {"itemName": item}, "auctions": auctions}).encode("utf-8")
+        bodies.append(gzip.compress(body))
+    return bodies
+
+
+def article_dates(n, seed=0):
+    # Byline strings in the formats normalize_date() handles: relative and absolute
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D")
+    kinds = rng.integers(0, 4, size=n)
+    amounts = rng.integers(1, 24, size=n)
+    formats = [
+        lambda i: f"Posted {amounts[i]} hr ago",
+        lambda i: f"Posted {amounts[i]} min ago",
+        lambda i: f"Posted {amounts[i]} days ago",
+        lambda i: f"Posted {dates[i].strftime('%B %d, %Y')}",
+    ]
+    return [formats[k](i) for i, k in enumerate(kinds)]
@@ -0,0 +1,175 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from wowah.simulator_v2 import INITIAL_GOLD, signals_from_ma, simulate
+from wowah.store import load_market_data
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+TRAIN_LEN = "14D"
+TEST_LEN = "7D"
+STEP = "7D"
+MA_WINDOW = 5
+OUT_DIR = "walk_forward"
+
+
+# -----------------------------
+# FOLDS
+# -----------------------------
+def make_folds(start, end, train_len=TRAIN_LEN, test_len=TEST_LEN, step=STEP):
+    # Train is [train_start, train_end], test is (train_end, test_end]
+    train_len, test_len, step = pd.Timedelta(train_len), pd.Timedelta(test_len), pd.Timedelta(step)
+    folds = []
+    train_start = pd.Timestamp(start)
+    while train_start + train_len < end:
+        train_end = train_start + train_len
+        folds.append({
+            "fold": len(folds) + 1,
+            "train_start": train_start,
+            "train_end": train_end,
+            "test_end": min(train_end + test_len, pd.Timestamp(end)),
+        })
+        train_start += step
+    return folds
+
+
+# -----------------------------
+# INCREMENTAL TRAILING MA
+# -----------------------------
+class TrailingMA:
+    # One rolling pass over the whole history. A fold's MA is the rolled value at
+    # the item's last row on or before train_end, valid when the fold's train
+    # window holds at least `window` rows of that item - the same rows the
+    # half/half split would average, without re-rolling each fold.
+    def __init__(self, df, window=MA_WINDOW):
+        self.window = window
+        df = df.reset_index(drop=True)
+        rolled = (
+            df.groupby("item_name", observed=True, sort=False)["market_value"]
+            .rolling(window).mean()
+            .droplevel(0)
+            .reindex(df.index)
+            .to_numpy()
+        )
+        times = pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8
+        self._series = {}
+        for item, idx in df.groupby("item_name", observed=True, sort=False).indices.items():
+            order = np.argsort(times[idx], kind="stable")
+            self._series[item] = (times[idx][order], rolled[idx][order])
+
+    def at(self, train_start, train_end):
+        start_ns = pd.Timestamp(train_start).as_unit("ns").value
+        end_ns = pd.Timestamp(train_end).as_unit("ns").value
+        ma = {}
+        for item, (times, rolled) in self._series.items():
+            lo = np.searchsorted(times, start_ns, side="left")
+            hi = np.searchsorted(times, end_ns, side="right")
+            if hi - lo >= self.window:
+                ma[item] = rolled[hi - 1]
+        return pd.Series(ma, dtype=float)
+
+
+# -----------------------------
+# FOLD RUNNER
+# -----------------------------
+# Filled once per worker by init_worker so the market frame is shipped once
+_worker = {}
+
+def init_worker(df):
+    _worker["df"] = df
+    _worker["times"] = pd.DatetimeIndex(df["timestamp"]).as_unit("ns").asi8
+
+def run_fold(fold, ma, snapshot_freq=None):
+    df, times = _worker["df"], _worker["times"]
+    lo = np.searchsorted(times, fold["train_end"].as_unit("ns").value, side="right")
+    hi = np.searchsorted(times, fold["test_end"].as_unit("ns").value, side="right")
+    test = df.iloc[lo:hi]
+
+    signals = signals_from_ma(test, ma)
+    trade_log, portfolio_df = simulate(signals, test, snapshot_freq)
+    final_value = portfolio_df["total_value"].iloc[-1] if len(portfolio_df) else INITIAL_GOLD
+    final_gold = portfolio_df["gold"].iloc[-1] if len(portfolio_df) else INITIAL_GOLD
+
+    trade_log.insert(0, "fold", fold["fold"])
+    metrics = {
+        **fold,
+        "test_rows": len(test),
+        "items_with_ma": int(ma.notna().sum()),
+        "signals": len(signals),
+        "trades": len(trade_log),
+        "final_gold": final_gold,
+        "total_value": final_value,
+        "return_pct": 100 * (final_value / INITIAL_GOLD - 1),
+    }
+    return metrics, trade_log
+
+def summarize(folds_df):
+    returns = folds_df["return_pct"]
+    return pd.DataFrame([{
+        "folds": len(folds_df),
+        "mean_return_pct": returns.mean(),
+        "std_return_pct": returns.std(),
+        "min_return_pct": returns.min(),
+        "max_return_pct": returns.max(),
+        "positive_folds_pct": 100 * (returns > 0).mean(),
+        "compounded_return_pct": 100 * ((1 + returns / 100).prod() - 1),
+        "total_trades": folds_df["trades"].sum(),
+    }])
+
+
+def walk_forward(df, train_len=TRAIN_LEN, test_len=TEST_LEN, step=STEP, window=MA_WINDOW,
+                 workers=None, snapshot_freq=None):
+    df = df.copy()
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df = df.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+    folds = make_folds(df["timestamp"].min(), df["timestamp"].max(), train_len, test_len, step)
+    trailing = TrailingMA(df, window)
+    mas = [trailing.at(f["train_start"], f["train_end"]) for f in folds]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(df,)) as executor:
+        results = list(executor.map(run_fold, folds, mas, [snapshot_freq] * len(folds)))
+
+    folds_df = pd.DataFrame([metrics for metrics, _ in results])
+    trades_df = pd.concat([log for _, log in results], ignore_index=True) if results else pd.DataFrame()
+    return folds_df, trades_df
+
+
+# -----------------------------
+# RUN
+# -----------------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the V2 moving-average strategy.")
+    parser.add_argument("--data", help="price store directory or CSV (default: ah_store/ if present, else the CSV)")
+    parser.add_argument("--train", default=TRAIN_LEN, help="train window length")
+    parser.add_argument("--test", default=TEST_LEN, help="test window length")
+    parser.add_argument("--step", default=STEP, help="distance between fold starts")
+    parser.add_argument("--window", type=int, default=MA_WINDOW, help="MA window in rows")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--snapshot-freq", help="portfolio snapshot cadence inside each fold")
+    parser.add_argument("--out-dir", default=OUT_DIR)
+    args = parser.parse_args(argv)
+
+    folds_df, trades_df = walk_forward(
+        load_market_data(args.data), args.train, args.test, args.step, args.window, args.workers, args.snapshot_freq
+    )
+    summary = summarize(folds_df)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    folds_df.to_csv(os.path.join(args.out_dir, "walk_forward_folds.csv"), index=False)
+    trades_df.to_csv(os.path.join(args.out_dir, "walk_forward_trades.csv"), index=False)
+    summary.to_csv(os.path.join(args.out_dir, "walk_forward_summary.csv"), index=False)
+
+    print(folds_df[["fold", "train_end", "test_end", "trades", "return_pct"]].to_string(index=False))
+    print("\n📊 Walk-forward summary:")
+    print(summary.T.to_string(header=False))
+    return folds_df, trades_df, summary
+
+
+if __name__ == "__main__":
+    main()